@@ -6,13 +6,11 @@ Berdasarkan script b.py - EXACT SAME METHODS
 
 import cv2
 import numpy as np
-from moviepy.editor import ImageSequenceClip
-import tempfile
 import os
 import logging
 import sys
-from skimage.morphology import skeletonize
-import random
+from modules.video_encoder import FFmpegFrameWriter, PngSequenceWriter, PipelinedFrameWriter, resolve_encoder_settings
+from modules.parallel_renderer import ParallelFrameRenderer, ParallelSegmentEncoder
 
 # Setup logging
 logging.basicConfig(
@@ -56,19 +54,49 @@ PAINT_STYLES = {
     }
 }
 
+# Batas default jumlah titik dasar untuk style line following (None = tanpa batas)
+MAX_REVEAL_BASE_POINTS = 5000
+
+# Tebal garis mode polyline, paling mirip dengan titik pensil circle radius 1 anti-aliased
+POLYLINE_THICKNESS = 2
+
+# Jumlah langkah classic stroke dan jumlah coretan chaotic scribble pada 1080p
+CLASSIC_STROKE_STEPS = 4000
+CHAOTIC_SCRIBBLES = 200
+
+# Jumlah langkah random walk per blok clamp (classic stroke / chaotic scribble)
+CLAMPED_WALK_BLOCK = 512
+
+# Mode preview: resolusi dan fps dibatasi (encoder memakai profile 'preview')
+PREVIEW_MAX_SIDE = 480
+PREVIEW_MAX_FPS = 12
+
+# Jumlah buffer frame antara thread render dan thread encoder (0 = tulis langsung di thread render)
+FRAME_QUEUE_SIZE = 8
+
 class AnimationCreator:
     def __init__(self):
         self.current_phase = ""
         self.total_phases = 6
         self.phase_progress = 0
+        self.max_base_points = MAX_REVEAL_BASE_POINTS
+        # Callback opsional (mis. antrian job server): dipanggil dengan dict event progress
+        self.progress_callback = None
+    
+    def notify_progress(self, **event):
+        """Kirim event progress ke progress_callback jika di-set"""
+        if self.progress_callback is not None:
+            self.progress_callback(event)
     
     def log_progress(self, message, emoji="ℹ️"):
         """Log with emoji and formatting"""
         print(f"{emoji} {message}")
         logger.info(message)
+        self.notify_progress(message=message)
     
     def log_phase_progress(self, phase_name, current, total, emoji="📊"):
         """Log phase progress with percentage"""
+        self.notify_progress(phase=phase_name, current=current, total=total)
         if total > 0:
             percentage = (current / total) * 100
             print(f"\r   {phase_name} Progress: {percentage:.1f}% ({current}/{total})", end="", flush=True)
@@ -120,6 +148,8 @@ class AnimationCreator:
 
     def skeletonize_image(self, binary_image):
         """Skeletonize gambar"""
+        # Import di sini: skimage berat dan tidak dipakai worker render (path sudah ada di job)
+        from skimage.morphology import skeletonize
         try:
             bool_img = binary_image > 0
             skeleton = skeletonize(bool_img).astype(np.uint8) * 255
@@ -147,164 +177,299 @@ class AnimationCreator:
             logger.error(f"Error in extract_drawing_path: {e}")
             raise
 
+    def load_drawing_paths(self, line_art_path, path_cache=None):
+        """Preprocess + skeleton + jalur gambar line art; pakai PathCache jika ada (hasilnya sama persis)"""
+        cache_key = None
+        if path_cache is not None:
+            cache_key = path_cache.make_key(line_art_path)
+            cached = path_cache.load(cache_key)
+            if cached is not None:
+                self.log_progress("Skeleton & jalur gambar diambil dari cache", "⚡")
+                return cached['paths']
+
+        binary = self.load_and_preprocess(line_art_path)
+        skeleton = self.skeletonize_image(binary)
+        paths = self.extract_drawing_path(skeleton)
+        if cache_key is not None:
+            path_cache.store(cache_key, binary, skeleton, paths)
+        return paths
+
     # === PAINT REVEAL FUNCTIONS (EXACT SAME dari script b.py) ===
-    def classic_stroke(self, width, height, step_size, num_frames):
-        """Generate classic stroke path"""
+    def _scaled_count(self, width, height, base_count):
+        """Jumlah langkah/coretan naik sesuai luas gambar (minimal base_count, sama seperti 1080p)"""
+        scale = (width * height) / (1920 * 1080)
+        return max(base_count, int(base_count * scale))
+
+    def _clamped_walk(self, starts, deltas, low, high, block=CLAMPED_WALK_BLOCK):
+        """Posisi random walk per baris: pos[k] = clip(pos[k-1] + deltas[k], low, high)
+
+        starts: (rows,), deltas: (rows, steps). Langkah diproses per blok block kolom, posisi akhir
+        blok jadi posisi awal blok berikutnya, jadi tiap pergantian sisi batas menghitung ulang
+        paling banyak satu blok (tidak quadratic untuk walk panjang di gambar besar).
+        """
+        positions = np.empty(deltas.shape, dtype=np.result_type(starts, deltas))
+        current = starts
+        for begin in range(0, deltas.shape[1], block):
+            end = min(begin + block, deltas.shape[1])
+            positions[:, begin:end] = self._clamped_walk_block(current, deltas[:, begin:end], low, high)
+            current = positions[:, end - 1]
+        return positions
+
+    def _clamped_walk_block(self, starts, deltas, low, high):
+        """Satu blok _clamped_walk: mulai dari cumsum tanpa clamp; di pelanggaran batas pertama sisa
+        baris dihitung ulang dengan rumus clamp satu sisi (running max dari overshoot).
+        Iterasi hanya sebanyak pergantian sisi batas, hasilnya sama persis dengan loop per langkah.
+        """
+        cumulative = np.cumsum(deltas, axis=1)
+        positions = starts[:, None] + cumulative
+        columns = np.arange(deltas.shape[1])
+        while True:
+            violated = (positions < low) | (positions > high)
+            rows = np.flatnonzero(violated.any(axis=1))
+            if len(rows) == 0:
+                return positions
+            first = violated[rows].argmax(axis=1)
+            # Kolom sebelum pelanggaran paling awal sudah final, cukup proses sisanya
+            offset = first.min()
+            first -= offset
+            row_index = np.arange(len(rows))
+            row_positions = positions[rows, offset:]
+            anchor = row_positions[row_index, first]
+            in_suffix = columns[None, :len(columns) - offset] >= first[:, None]
+
+            # Posisi mentah (tanpa clamp) mulai dari langkah yang pertama melanggar batas
+            row_cumulative = cumulative[rows, offset:]
+            raw = anchor[:, None] + row_cumulative - row_cumulative[row_index, first][:, None]
+            below = (anchor < low)[:, None]
+            overshoot = np.where(in_suffix, np.where(below, low - raw, raw - high), 0)
+            correction = np.maximum.accumulate(np.maximum(overshoot, 0), axis=1)
+            clamped = np.where(below, raw + correction, raw - correction)
+            positions[rows, offset:] = np.where(in_suffix, clamped, row_positions)
+
+    def classic_stroke(self, width, height, step_size, num_frames, rng=None, steps=None):
+        """Generate classic stroke path - array (steps + 1, 2)"""
         try:
-            def generate_path(steps):
-                path = [(width // 2, height // 2)]
-                angle = np.random.uniform(0, 2 * np.pi)
-                for _ in range(steps):
-                    angle += np.random.normal(0, 0.4)
-                    dx = int(step_size * np.cos(angle))
-                    dy = int(step_size * np.sin(angle))
-                    x = np.clip(path[-1][0] + dx, 0, width - 1)
-                    y = np.clip(path[-1][1] + dy, 0, height - 1)
-                    path.append((x, y))
-                return path
-            
-            path = generate_path(4000)
+            if rng is None:
+                rng = np.random.default_rng()
+            if steps is None:
+                steps = self._scaled_count(width, height, CLASSIC_STROKE_STEPS)
+
+            # Sudut kumulatif untuk semua langkah sekaligus
+            angles = rng.uniform(0, 2 * np.pi) + np.cumsum(rng.normal(0, 0.4, steps))
+            dx = (step_size * np.cos(angles)).astype(np.int64)
+            dy = (step_size * np.sin(angles)).astype(np.int64)
+
+            path = np.empty((steps + 1, 2), dtype=np.int64)
+            path[0] = (width // 2, height // 2)
+            path[1:, 0] = self._clamped_walk(path[:1, 0], dx[None, :], 0, width - 1)[0]
+            path[1:, 1] = self._clamped_walk(path[:1, 1], dy[None, :], 0, height - 1)[0]
+
             per_frame = max(1, len(path) // num_frames if num_frames > 0 else len(path))
             return path, per_frame
         except Exception as e:
             logger.error(f"Error in classic_stroke: {e}")
             raise
 
-    def chaotic_scribble(self, width, height, step_size, num_frames):
-        """Generate chaotic scribble paths"""
+    def chaotic_scribble(self, width, height, step_size, num_frames, rng=None, num_scribbles=None):
+        """Generate chaotic scribble paths - array (N, 2)"""
         try:
-            paths = []
-            for _ in range(200):
-                start_x, start_y = np.random.randint(0, width), np.random.randint(0, height)
-                path = [(start_x, start_y)]
-                angle = np.random.uniform(0, 2 * np.pi)
-                for _ in range(np.random.randint(5, 25)):
-                    angle += np.random.normal(0, 1.5)
-                    dx = int(step_size * 0.5 * np.cos(angle))
-                    dy = int(step_size * 0.5 * np.sin(angle))
-                    x = np.clip(path[-1][0] + dx, 0, width - 1)
-                    y = np.clip(path[-1][1] + dy, 0, height - 1)
-                    path.append((x, y))
-                paths.extend(path)
-            
+            if rng is None:
+                rng = np.random.default_rng()
+            if num_scribbles is None:
+                num_scribbles = self._scaled_count(width, height, CHAOTIC_SCRIBBLES)
+
+            # Semua coretan dihitung sebagai satu array (scribble, langkah), langkah sisa diberi delta 0
+            start_x = rng.integers(0, width, num_scribbles)
+            start_y = rng.integers(0, height, num_scribbles)
+            lengths = rng.integers(5, 25, num_scribbles)
+            max_length = lengths.max()
+            angles = rng.uniform(0, 2 * np.pi, num_scribbles)[:, None] + np.cumsum(
+                rng.normal(0, 1.5, (num_scribbles, max_length)), axis=1)
+            active = np.arange(max_length)[None, :] < lengths[:, None]
+            dx = np.where(active, (step_size * 0.5 * np.cos(angles)).astype(np.int64), 0)
+            dy = np.where(active, (step_size * 0.5 * np.sin(angles)).astype(np.int64), 0)
+
+            xs = np.concatenate([start_x[:, None], self._clamped_walk(start_x, dx, 0, width - 1)], axis=1)
+            ys = np.concatenate([start_y[:, None], self._clamped_walk(start_y, dy, 0, height - 1)], axis=1)
+            keep = np.arange(max_length + 1)[None, :] <= lengths[:, None]
+            paths = np.stack([xs[keep], ys[keep]], axis=1)
+
             per_frame = max(1, len(paths) // num_frames if num_frames > 0 else len(paths))
             return paths, per_frame
         except Exception as e:
             logger.error(f"Error in chaotic_scribble: {e}")
             raise
 
-    def textured_brush(self, width, height, step_size, stroke_thickness, num_frames):
+    def _make_brush_texture(self, stroke_thickness):
+        """Stamp brush lingkaran penuh berukuran 2x stroke_thickness"""
+        brush_size = stroke_thickness * 2
+        brush_texture = np.zeros((brush_size, brush_size), dtype=np.uint8)
+        center = brush_size // 2
+        y, x = np.ogrid[:brush_size, :brush_size]
+        mask = (x - center)**2 + (y - center)**2 <= center**2
+        brush_texture[mask] = 255
+        return brush_texture
+
+    def textured_brush(self, width, height, step_size, stroke_thickness, num_frames, rng=None):
         """Generate textured brush path"""
         try:
-            path, per_frame = self.classic_stroke(width, height, step_size, num_frames)
-            brush_size = stroke_thickness * 2
-            brush_texture = np.zeros((brush_size, brush_size), dtype=np.uint8)
-            center = brush_size // 2
-            y, x = np.ogrid[:brush_size, :brush_size]
-            mask = (x - center)**2 + (y - center)**2 <= center**2
-            brush_texture[mask] = 255
+            path, per_frame = self.classic_stroke(width, height, step_size, num_frames, rng=rng)
+            brush_texture = self._make_brush_texture(stroke_thickness)
             return path, per_frame, brush_texture
         except Exception as e:
             logger.error(f"Error in textured_brush: {e}")
             raise
 
-    def random_line_following(self, all_drawing_points, width, height, step_size, num_frames):
+    def _expand_line_points(self, all_drawing_points, width, height, step_size, max_base_points):
+        """Sample titik line art lalu expand ke grid dx/dy di sekitarnya - return array (N, 2)"""
+        points = np.asarray(all_drawing_points, dtype=np.int64).reshape(-1, 2)
+
+        # OPTIMIZATION: Smart sampling to limit base points (Option 2), urutan tetap sama
+        if max_base_points is not None and len(points) > max_base_points:
+            # Sample every Nth point to reduce base points
+            sample_step = max(1, len(points) // max_base_points)
+            sampled_points = points[::sample_step]
+            logger.info(f"Sampled {len(sampled_points)} points from {len(points)} original points")
+        else:
+            sampled_points = points
+
+        # OPTIMIZATION: Reduced expansion range (Option 1)
+        # Original: step_size//4 (~37 range) = 38x38 = 1444 points per base point
+        # New: step_size//10 (~15 range) = 8x8 = 64 points per base point
+        expansion_range = max(2, step_size//10)  # Much smaller expansion
+        expansion_step = max(2, step_size//20)   # Larger step for fewer points
+        offsets = np.arange(-expansion_range, expansion_range + 1, expansion_step)
+
+        # Offset grid dengan urutan dx (luar) lalu dy (dalam), sama seperti nested loop lama
+        dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+        grid = np.stack([dx.ravel(), dy.ravel()], axis=1)
+
+        expanded_points = (sampled_points[:, None, :] + grid[None, :, :]).reshape(-1, 2)
+        np.clip(expanded_points[:, 0], 0, width - 1, out=expanded_points[:, 0])
+        np.clip(expanded_points[:, 1], 0, height - 1, out=expanded_points[:, 1])
+        return expanded_points
+
+    def random_line_following(self, all_drawing_points, width, height, step_size, num_frames, max_base_points=None,
+                              rng=None):
         """Generate random line following path - mengikuti jalur speed drawing secara random"""
         try:
-            if not all_drawing_points:
+            if rng is None:
+                rng = np.random.default_rng()
+            if len(all_drawing_points) == 0:
                 # Fallback to classic stroke if no drawing points
-                return self.classic_stroke(width, height, step_size, num_frames)
-            
-            # OPTIMIZATION: Smart sampling to limit base points (Option 2)
-            max_base_points = 5000  # Limit to max 5000 base points for performance
-            if len(all_drawing_points) > max_base_points:
-                # Sample every Nth point to reduce base points
-                sample_step = max(1, len(all_drawing_points) // max_base_points)
-                sampled_points = all_drawing_points[::sample_step]
-                logger.info(f"Sampled {len(sampled_points)} points from {len(all_drawing_points)} original points")
-            else:
-                sampled_points = all_drawing_points
-            
-            # OPTIMIZATION: Reduced expansion range (Option 1)
-            # Original: step_size//4 (~37 range) = 38x38 = 1444 points per base point
-            # New: step_size//10 (~15 range) = 8x8 = 64 points per base point
-            # Reduction: ~96% less points!
-            expanded_points = []
-            expansion_range = max(2, step_size//10)  # Much smaller expansion
-            expansion_step = max(2, step_size//20)   # Larger step for fewer points
-            
-            for pt in sampled_points:
-                # Add points around each line art point with optimized thickness
-                for dx in range(-expansion_range, expansion_range + 1, expansion_step):
-                    for dy in range(-expansion_range, expansion_range + 1, expansion_step):
-                        new_x = np.clip(pt[0] + dx, 0, width - 1)
-                        new_y = np.clip(pt[1] + dy, 0, height - 1)
-                        expanded_points.append((new_x, new_y))
-            
+                return self.classic_stroke(width, height, step_size, num_frames, rng=rng)
+
+            if max_base_points is None:
+                max_base_points = self.max_base_points
+            expanded_points = self._expand_line_points(all_drawing_points, width, height, step_size, max_base_points)
             logger.info(f"Generated {len(expanded_points)} expanded points for random line following")
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_points = []
-            for pt in expanded_points:
-                if pt not in seen:
-                    seen.add(pt)
-                    unique_points.append(pt)
-            
+
+            # Remove duplicates while preserving order (kemunculan pertama tiap pixel)
+            keys = expanded_points[:, 1] * width + expanded_points[:, 0]
+            _, first_index = np.unique(keys, return_index=True)
+            unique_points = expanded_points[np.sort(first_index)]
+
             # Shuffle points for random reveal
-            import random
-            random.shuffle(unique_points)
-            
+            unique_points = unique_points[rng.permutation(len(unique_points))]
+
             per_frame = max(1, len(unique_points) // num_frames if num_frames > 0 else len(unique_points))
             return unique_points, per_frame
-            
+
         except Exception as e:
             logger.error(f"Error in random_line_following: {e}")
             raise
 
-    def line_art_following(self, all_drawing_points, width, height, step_size, num_frames):
+    def line_art_following(self, all_drawing_points, width, height, step_size, num_frames, max_base_points=None,
+                           rng=None):
         """Generate line art following path - mengikuti jalur speed drawing dengan urutan yang sama"""
         try:
-            if not all_drawing_points:
+            if len(all_drawing_points) == 0:
                 # Fallback to classic stroke if no drawing points
-                return self.classic_stroke(width, height, step_size, num_frames)
-            
-            # OPTIMIZATION: Smart sampling to limit base points (Option 2)
-            max_base_points = 5000  # Limit to max 5000 base points for performance
-            if len(all_drawing_points) > max_base_points:
-                # Sample every Nth point to reduce base points, but maintain order
-                sample_step = max(1, len(all_drawing_points) // max_base_points)
-                sampled_points = all_drawing_points[::sample_step]
-                logger.info(f"Sampled {len(sampled_points)} points from {len(all_drawing_points)} original points (maintaining order)")
-            else:
-                sampled_points = all_drawing_points
-            
-            # OPTIMIZATION: Reduced expansion range (Option 1)
-            # Original: step_size//3 (~50 range) = 50x50 = 2500 points per base point
-            # New: step_size//10 (~15 range) = 8x8 = 64 points per base point
-            # Reduction: ~97% less points!
-            expanded_points = []
-            expansion_range = max(2, step_size//10)  # Much smaller expansion
-            expansion_step = max(2, step_size//20)   # Larger step for fewer points
-            
-            for pt in sampled_points:  # Mengikuti urutan yang sama dengan speed drawing (sampled)
-                # Add points around each line art point with optimized thickness
-                for dx in range(-expansion_range, expansion_range + 1, expansion_step):
-                    for dy in range(-expansion_range, expansion_range + 1, expansion_step):
-                        new_x = np.clip(pt[0] + dx, 0, width - 1)
-                        new_y = np.clip(pt[1] + dy, 0, height - 1)
-                        expanded_points.append((new_x, new_y))
-            
+                return self.classic_stroke(width, height, step_size, num_frames, rng=rng)
+
+            if max_base_points is None:
+                max_base_points = self.max_base_points
+            # Mengikuti urutan yang sama dengan speed drawing (sampled)
+            expanded_points = self._expand_line_points(all_drawing_points, width, height, step_size, max_base_points)
             logger.info(f"Generated {len(expanded_points)} expanded points for line art following")
-            
+
             # TIDAK shuffle - tetap mengikuti urutan speed drawing
             per_frame = max(1, len(expanded_points) // num_frames if num_frames > 0 else len(expanded_points))
             return expanded_points, per_frame
-            
+
         except Exception as e:
             logger.error(f"Error in line_art_following: {e}")
             raise
 
+    def _stamp_drawing_points(self, canvas, points, line_color_bgr):
+        """Gambar titik speed drawing ke canvas dengan style pensil natural"""
+        for pt in points:
+            # Thin pencil dengan anti-aliasing untuk smooth line (ukuran tetap)
+            cv2.circle(canvas, pt, radius=1, color=line_color_bgr, thickness=0, lineType=cv2.LINE_AA)
+
+    def _pencil_segments(self, job, start, stop):
+        """Potongan kontur untuk titik [start, stop), disambung dengan titik sebelumnya supaya tidak putus"""
+        path_starts, path_ends = job['path_starts'], job['path_ends']
+        first_path = np.searchsorted(path_ends, start, side='right')
+        last_path = np.searchsorted(path_starts, stop, side='left')
+        segments = []
+        for path_index in range(first_path, last_path):
+            offset = path_starts[path_index]
+            local_start = max(start - offset, 0)
+            local_stop = min(stop, path_ends[path_index]) - offset
+            segment = job['drawing_paths'][path_index][max(local_start - 1, 0):local_stop]
+            # Polyline 1 titik tidak tergambar; titik ini ikut tersambung di frame berikutnya
+            if len(segment) > 1:
+                segments.append(segment.reshape(-1, 1, 2).astype(np.int32))
+        return segments
+
+    def draw_pencil_range(self, job, canvas, start, stop):
+        """Gambar titik speed drawing [start, stop) ke canvas sesuai line_renderer job"""
+        if stop <= start:
+            return
+        if job['line_renderer'] == 'polyline':
+            # Satu panggilan cv2.polylines untuk semua kontur yang baru terbuka
+            segments = self._pencil_segments(job, start, stop)
+            if segments:
+                cv2.polylines(canvas, segments, False, job['line_color_bgr'], POLYLINE_THICKNESS, lineType=cv2.LINE_AA)
+        else:
+            self._stamp_drawing_points(canvas, job['all_drawing_points'][start:stop], job['line_color_bgr'])
+
+    def _stamp_reveal_points(self, mask, points_to_draw, job):
+        """Gambar titik paint reveal satu frame ke mask sesuai style - EXACT SAME"""
+        style_choice = job['style_choice']
+        stroke_thickness = job['stroke_thickness']
+        height, width = mask.shape
+        if style_choice == 3:  # Textured Brush
+            # Stamp brush dipotong (slice) di tepi gambar, tidak di-resize; clipping semua titik frame dihitung sekaligus
+            brush_texture = job['brush_texture']
+            brush_h, brush_w = brush_texture.shape
+            points = np.asarray(points_to_draw).reshape(-1, 2)
+            top = points[:, 1] - brush_h // 2
+            left = points[:, 0] - brush_w // 2
+            y1, y2 = np.maximum(top, 0), np.minimum(top + brush_h, height)
+            x1, x2 = np.maximum(left, 0), np.minimum(left + brush_w, width)
+            visible = (y2 > y1) & (x2 > x1)
+            stamps = np.stack([top, left, y1, y2, x1, x2], axis=1)[visible]
+            for stamp_top, stamp_left, sy1, sy2, sx1, sx2 in stamps.tolist():
+                mask_roi = mask[sy1:sy2, sx1:sx2]
+                brush_roi = brush_texture[sy1 - stamp_top:sy2 - stamp_top, sx1 - stamp_left:sx2 - stamp_left]
+                np.maximum(mask_roi, brush_roi, out=mask_roi)
+        elif style_choice == 1:  # Classic Stroke
+            for j in range(len(points_to_draw) - 1):
+                pt1 = points_to_draw[j]
+                pt2 = points_to_draw[j+1]
+                cv2.line(mask, pt1, pt2, 255, stroke_thickness, lineType=cv2.LINE_AA)
+        elif style_choice == 2:  # Chaotic Scribble
+            for pt in points_to_draw:
+                cv2.circle(mask, pt, stroke_thickness // 2, 255, -1)
+        elif style_choice == 4:  # Random Line Following
+            for pt in points_to_draw:
+                cv2.circle(mask, pt, stroke_thickness // 3, 255, -1)
+        elif style_choice == 5:  # Line Art Following
+            for pt in points_to_draw:
+                cv2.circle(mask, pt, stroke_thickness // 3, 255, -1)
+
     def _hex_to_bgr(self, hex_color):
         """Convert hex color to BGR tuple for OpenCV"""
         try:
@@ -319,240 +484,667 @@ class AnimationCreator:
             logger.error(f"Error converting hex color {hex_color}: {e}")
             return (60, 60, 60)  # Default dark gray
 
+    # === RENDER JOB (FASE 1-4) ===
+    def prepare_render_job(self, line_art_path, color_image_path, style_choice, drawing_duration, reveal_duration, fps,
+                           reveal_area_multiplier=1.0, animation_mode='full', line_color=None, background_color=None,
+                           line_renderer='circles', path_cache=None, seed=None):
+        """Siapkan semua data render (fase 1-4) dalam satu dict job
+
+        seed menentukan semua angka random paint reveal (seed sama = video sama persis).
+        """
+        # === FASE 1: PERSIAPAN DATA SPEED DRAWING ===
+        logger.info("=== PHASE 1: SPEED DRAWING PREPARATION ===")
+        self.log_progress("Memproses line art untuk speed drawing...", "📐")
+        paths = self.load_drawing_paths(line_art_path, path_cache)
+
+        # Gabungkan semua titik ke dalam list tunggal - EXACT SAME
+        all_drawing_points = []
+        for path in paths:
+            for pt in path:
+                all_drawing_points.append(tuple(pt))
+
+        self.log_progress(f"Ditemukan {len(all_drawing_points)} titik untuk speed drawing", "✅")
+
+        # Batas tiap kontur di list titik gabungan (untuk mode polyline)
+        path_lengths = np.array([len(path) for path in paths], dtype=np.int64)
+        path_ends = np.cumsum(path_lengths)
+
+        # === FASE 2: LOAD GAMBAR ===
+        logger.info("=== PHASE 2: LOADING IMAGES ===")
+        self.log_progress("Loading gambar...", "📂")
+        line_art = cv2.imread(line_art_path)
+        color_img = cv2.imread(color_image_path)
+
+        if line_art is None or color_img is None:
+            raise ValueError("Failed to load images")
+
+        # Resize color image to match line art
+        color_img = cv2.resize(color_img, (line_art.shape[1], line_art.shape[0]))
+        height, width = line_art.shape[:2]
+
+        self.log_progress(f"Resolusi: {width}x{height}", "📐")
+
+        # === FASE 3: SETUP PARAMETER ===
+        logger.info("=== PHASE 3: PARAMETER SETUP ===")
+        scale = (width * height) / (1920 * 1080)
+        base_stroke_thickness = max(10, int(150 * scale))
+        base_step_size = max(10, int(150 * scale))
+
+        # Apply reveal area multiplier
+        stroke_thickness = max(10, int(base_stroke_thickness * reveal_area_multiplier))
+        step_size = max(10, int(base_step_size * reveal_area_multiplier))
+
+        drawing_frames = int(drawing_duration * fps)
+        reveal_frames = int(reveal_duration * fps)
+
+        total_frames = drawing_frames + reveal_frames
+
+        self.log_progress(f"Stroke thickness: {stroke_thickness}", "🖌️")
+        self.log_progress(f"Reveal area multiplier: {reveal_area_multiplier}x", "📏")
+        self.log_progress(f"Speed drawing frames: {drawing_frames}", "🎬")
+        self.log_progress(f"Paint reveal frames: {reveal_frames}", "🎨")
+        self.log_progress(f"Total frames: {total_frames}", "📊")
+
+        drawing_step = max(1, len(all_drawing_points) // drawing_frames)
+
+        # Tahan frame terakhir speed drawing sebentar - EXACT SAME
+        pause_frames = fps // 2 if animation_mode == 'full' else fps * 2  # 0.5s for full mode, 2s for drawing only
+
+        # Untuk drawing only mode, hitung pause frames supaya total durasi sesuai user input
+        if animation_mode == 'drawing_only':
+            target_total_frames = int(drawing_duration * fps)
+            remaining_frames = max(0, target_total_frames - drawing_frames)
+            pause_frames = remaining_frames
+
+        # === PARSE COLOR SETTINGS FOR DRAWING ONLY MODE ===
+        if animation_mode == 'drawing_only' and line_color and background_color:
+            # Convert hex colors to BGR for OpenCV
+            line_color_bgr = self._hex_to_bgr(line_color)
+            background_color_bgr = self._hex_to_bgr(background_color)
+            self.log_progress(f"Line color: {line_color} -> BGR{line_color_bgr}", "🎨")
+            self.log_progress(f"Background color: {background_color} -> BGR{background_color_bgr}", "🖼️")
+        else:
+            line_color_bgr = (60, 60, 60)  # Default dark gray
+            background_color_bgr = (255, 255, 255)  # Default white
+
+        # === FASE 4: PERSIAPAN DATA PAINT REVEAL ===
+        # Skip paint reveal preparation if drawing only mode
+        paint_data, per_frame, brush_texture = [], 1, None
+        rng = np.random.default_rng(seed)
+        if animation_mode == 'full':
+            logger.info("=== PHASE 4: PAINT REVEAL PREPARATION ===")
+            self.log_progress("Mempersiapkan data paint reveal...", "🎨")
+            if seed is not None:
+                self.log_progress(f"Seed: {seed}", "🎲")
+            selected_style = PAINT_STYLES[style_choice]
+
+            if style_choice == 1:
+                paint_data, per_frame = self.classic_stroke(width, height, step_size, reveal_frames, rng=rng)
+            elif style_choice == 2:
+                paint_data, per_frame = self.chaotic_scribble(width, height, step_size, reveal_frames, rng=rng)
+            elif style_choice == 3:
+                paint_data, per_frame, brush_texture = self.textured_brush(width, height, step_size, stroke_thickness,
+                                                                           reveal_frames, rng=rng)
+            elif style_choice == 4:
+                paint_data, per_frame = self.random_line_following(all_drawing_points, width, height, step_size,
+                                                                   reveal_frames, rng=rng)
+            elif style_choice == 5:
+                paint_data, per_frame = self.line_art_following(all_drawing_points, width, height, step_size,
+                                                                reveal_frames, rng=rng)
+
+            self.log_progress(f"Data paint reveal siap: {len(paint_data)} titik", "✅")
+        else:
+            logger.info("=== PHASE 4: SKIPPING PAINT REVEAL (DRAWING ONLY MODE) ===")
+            self.log_progress("Mode: Speed Drawing Only - skipping paint reveal preparation", "✏️")
+            selected_style = {"name": "drawing_only"}
+
+        return {
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'animation_mode': animation_mode,
+            'style_choice': style_choice,
+            'seed': seed,
+            'selected_style': selected_style,
+            'stroke_thickness': stroke_thickness,
+            'all_drawing_points': all_drawing_points,
+            'drawing_paths': paths,
+            'path_starts': path_ends - path_lengths,
+            'path_ends': path_ends,
+            'line_renderer': line_renderer,
+            'drawing_frames': drawing_frames,
+            'drawing_step': drawing_step,
+            'pause_frames': pause_frames,
+            'reveal_frames': reveal_frames,
+            'paint_data': paint_data,
+            'per_frame': per_frame,
+            'brush_texture': brush_texture,
+            'color_img': color_img,
+            'line_color_bgr': line_color_bgr,
+            'background_color_bgr': background_color_bgr
+        }
+
+    def scale_render_job(self, job, max_side):
+        """Perkecil job (preview/thumbnail) supaya sisi terpanjang <= max_side
+
+        Semua koordinat, tebal stroke dan brush ikut diskalakan dari job resolusi penuh,
+        jadi hasilnya versi kecil dari render final (jumlah titik dan timing tetap sama).
+        """
+        width, height = job['width'], job['height']
+        if max(width, height) <= max_side:
+            return job
+        scale = max_side / max(width, height)
+        # Dimensi genap untuk yuv420p
+        new_width = max(2, int(round(width * scale / 2)) * 2)
+        new_height = max(2, int(round(height * scale / 2)) * 2)
+        factors = np.array([new_width / width, new_height / height])
+        limits = np.array([new_width - 1, new_height - 1])
+
+        def scale_points(points):
+            points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            return np.clip(np.round(points * factors), 0, limits).astype(np.int64)
+
+        job['all_drawing_points'] = [tuple(pt) for pt in scale_points(job['all_drawing_points']).tolist()]
+        job['drawing_paths'] = [scale_points(path).astype(np.int32) for path in job['drawing_paths']]
+        if len(job['paint_data']):
+            job['paint_data'] = scale_points(job['paint_data'])
+        job['stroke_thickness'] = max(1, int(round(job['stroke_thickness'] * scale)))
+        if job['brush_texture'] is not None:
+            job['brush_texture'] = self._make_brush_texture(job['stroke_thickness'])
+        job['color_img'] = cv2.resize(job['color_img'], (new_width, new_height), interpolation=cv2.INTER_AREA)
+        job['width'], job['height'] = new_width, new_height
+        self.log_progress(f"Preview: {width}x{height} -> {new_width}x{new_height}", "🔍")
+        return job
+
+    def get_total_frames(self, job):
+        """Jumlah frame video untuk job (drawing + pause + reveal + hold warna)"""
+        total = job['drawing_frames'] + job['pause_frames']
+        if job['animation_mode'] == 'full':
+            total += job['reveal_frames'] + job['fps']
+        return total
+
+    # === REVEAL TIME MAP ===
+    # Speed drawing dan paint reveal sama-sama kumulatif: pixel yang sudah muncul tidak hilang lagi.
+    # Time map menyimpan index frame pertama tiap pixel muncul, jadi frame N = (timemap <= N) + masked copy.
+    def _timemap_dtype(self, num_frames):
+        """uint16 cukup untuk < 65535 frame, selebihnya uint32"""
+        return np.uint16 if num_frames < np.iinfo(np.uint16).max else np.uint32
+
+    def build_drawing_timemap(self, job, final_drawing_canvas):
+        """Time map speed drawing: frame pertama pixel terkena titik pensil"""
+        height, width = job['height'], job['width']
+        drawing_frames = job['drawing_frames']
+        dtype = self._timemap_dtype(drawing_frames)
+        timemap = np.full((height, width), np.iinfo(dtype).max, dtype=dtype)
+
+        points = np.asarray(job['all_drawing_points'], dtype=np.int64).reshape(-1, 2)
+        if len(points) == 0:
+            return timemap
+
+        # Titik ke-k muncul di frame k // drawing_step + 1 (frame i menggambar titik [:i * drawing_step]),
+        # titik sisa baru muncul di frame pause (= drawing_frames)
+        point_frames = np.minimum(np.arange(len(points)) // job['drawing_step'] + 1, drawing_frames)
+
+        # Footprint satu titik pensil (circle radius 1 anti-aliased, atau area garis polyline)
+        footprint = np.zeros((7, 7), dtype=np.uint8)
+        if job['line_renderer'] == 'polyline':
+            cv2.circle(footprint, (3, 3), radius=POLYLINE_THICKNESS, color=255, thickness=-1, lineType=cv2.LINE_AA)
+        else:
+            cv2.circle(footprint, (3, 3), radius=1, color=255, thickness=0, lineType=cv2.LINE_AA)
+        offsets_y, offsets_x = np.nonzero(footprint)
+
+        ys = (points[:, 1][:, None] + (offsets_y - 3)[None, :]).ravel()
+        xs = (points[:, 0][:, None] + (offsets_x - 3)[None, :]).ravel()
+        frames = np.repeat(point_frames, len(offsets_y))
+        inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        flat_index = ys[inside] * width + xs[inside]
+        frames = frames[inside]
+
+        # Ambil frame terkecil per pixel: urutkan berdasarkan frame, ambil kemunculan pertama tiap pixel
+        order = np.argsort(frames, kind='stable')
+        unique_index, first = np.unique(flat_index[order], return_index=True)
+        timemap.flat[unique_index] = frames[order][first]
+
+        # Pixel yang tidak berubah di canvas akhir tidak perlu di-copy
+        background = np.array(job['background_color_bgr'], dtype=np.uint8)
+        unchanged = np.all(final_drawing_canvas == background, axis=2)
+        timemap[unchanged] = np.iinfo(dtype).max
+        return timemap
+
+    def build_reveal_timemap(self, job):
+        """Time map paint reveal: frame pertama mask pixel mencapai 255"""
+        height, width = job['height'], job['width']
+        reveal_frames = job['reveal_frames']
+        dtype = self._timemap_dtype(reveal_frames)
+        unset = np.iinfo(dtype).max
+        timemap = np.full((height, width), unset, dtype=dtype)
+        mask = np.zeros((height, width), dtype=np.uint8)
+
+        # Simulasi mask sekali per job (mask hanya bertambah, jadi cukup catat kapan pixel jadi 255)
+        for i in range(reveal_frames):
+            dirty_rect = self.advance_reveal_mask(job, mask, i)
+            if dirty_rect is None:
+                continue
+            x1, y1, x2, y2 = dirty_rect
+            timemap_roi = timemap[y1:y2, x1:x2]
+            timemap_roi[(mask[y1:y2, x1:x2] == 255) & (timemap_roi == unset)] = i
+        return timemap
+
+    def render_final_drawing_canvas(self, job):
+        """Canvas speed drawing lengkap (semua titik sudah tergambar)
+
+        Dimajukan per frame seperti render berurutan, supaya sambungan potongan polyline
+        antar frame sama persis di semua renderer.
+        """
+        canvas = np.full((job['height'], job['width'], 3), job['background_color_bgr'], dtype=np.uint8)
+        drawn_points = 0
+        for frame_index in range(job['drawing_frames']):
+            drawn_points = self.advance_drawing_canvas(job, canvas, drawn_points, frame_index)
+        self.draw_pencil_range(job, canvas, drawn_points, len(job['all_drawing_points']))
+        return canvas
+
+    def build_timemaps(self, job):
+        """Hitung canvas akhir + semua time map untuk job (sekali per job)"""
+        height, width = job['height'], job['width']
+        final_drawing_canvas = self.render_final_drawing_canvas(job)
+
+        job['background_canvas'] = np.full((height, width, 3), job['background_color_bgr'], dtype=np.uint8)
+        job['final_drawing_canvas'] = final_drawing_canvas
+        job['drawing_timemap'] = self.build_drawing_timemap(job, final_drawing_canvas)
+        if job['animation_mode'] == 'full':
+            job['reveal_timemap'] = self.build_reveal_timemap(job)
+        return job
+
+    def _compose_timemap_frame(self, timemap, frame_index, base, overlay, out):
+        """Frame = base, lalu overlay di pixel yang timemap <= frame_index"""
+        np.copyto(out, base)
+        np.copyto(out, overlay, where=(timemap <= frame_index)[:, :, None])
+        return out
+
+    def render_frame(self, job, frame_index, out=None):
+        """Render satu frame (index global video) langsung dari time map"""
+        if 'drawing_timemap' not in job:
+            self.build_timemaps(job)
+        if out is None:
+            out = np.empty((job['height'], job['width'], 3), dtype=np.uint8)
+
+        drawing_frames = job['drawing_frames']
+        reveal_start = drawing_frames + job['pause_frames']
+        if frame_index < 0 or frame_index >= self.get_total_frames(job):
+            raise IndexError(f"Frame {frame_index} di luar range (total {self.get_total_frames(job)})")
+
+        if frame_index < drawing_frames:
+            return self._compose_timemap_frame(job['drawing_timemap'], frame_index,
+                                               job['background_canvas'], job['final_drawing_canvas'], out)
+        if frame_index < reveal_start:
+            np.copyto(out, job['final_drawing_canvas'])
+            return out
+        if frame_index < reveal_start + job['reveal_frames']:
+            return self._compose_timemap_frame(job['reveal_timemap'], frame_index - reveal_start,
+                                               job['final_drawing_canvas'], job['color_img'], out)
+        np.copyto(out, job['color_img'])
+        return out
+
+    def render_frames(self, job, start=0, stop=None):
+        """Generator frame [start, stop) dari time map (buffer output dipakai ulang, copy jika perlu disimpan)"""
+        if stop is None:
+            stop = self.get_total_frames(job)
+        out = np.empty((job['height'], job['width'], 3), dtype=np.uint8)
+        for frame_index in range(start, stop):
+            yield self.render_frame(job, frame_index, out)
+
+    # === FASE 5: FRAME GENERATION ===
+    def advance_drawing_canvas(self, job, canvas, drawn_points, frame_index):
+        """Tambah titik speed drawing ke canvas sampai frame_index, return jumlah titik yang sudah tergambar"""
+        # Gambar hanya titik yang baru dilalui sejak frame sebelumnya (TIDAK TERPENGARUH area multiplier)
+        target_points = min(frame_index * job['drawing_step'], len(job['all_drawing_points']))
+        self.draw_pencil_range(job, canvas, drawn_points, target_points)
+        return max(drawn_points, target_points)
+
+    def _reveal_margin(self, job):
+        """Jarak maksimum pixel mask yang bisa berubah dari titik paint (radius stroke/brush + anti-alias)"""
+        margin = job['stroke_thickness']
+        if job['brush_texture'] is not None:
+            margin = max(margin, max(job['brush_texture'].shape) // 2)
+        return margin + 2
+
+    def advance_reveal_mask(self, job, mask, frame_index):
+        """Gambar titik paint reveal untuk frame_index ke mask
+
+        Return dirty rect (x1, y1, x2, y2) area mask yang berubah di frame ini, atau None.
+        """
+        paint_data, per_frame = job['paint_data'], job['per_frame']
+        start_index = frame_index * per_frame
+        end_index = min(start_index + per_frame, len(paint_data))
+        points_to_draw = paint_data[start_index:end_index]
+
+        if not len(points_to_draw):
+            return None
+        points_array = np.asarray(points_to_draw)
+        if isinstance(points_to_draw, np.ndarray):
+            points_to_draw = points_to_draw.tolist()
+        self._stamp_reveal_points(mask, points_to_draw, job)
+
+        height, width = mask.shape
+        margin = self._reveal_margin(job)
+        x1 = max(int(points_array[:, 0].min()) - margin, 0)
+        y1 = max(int(points_array[:, 1].min()) - margin, 0)
+        x2 = min(int(points_array[:, 0].max()) + margin + 1, width)
+        y2 = min(int(points_array[:, 1].max()) + margin + 1, height)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2, y2
+
+    def blend_reveal_frame(self, job, mask, final_drawing_canvas):
+        """Blend dengan color image - EXACT SAME"""
+        mask_3ch = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+        return np.where(mask_3ch == 255, job['color_img'], final_drawing_canvas)
+
+    def composite_reveal_frame(self, job, mask, frame, dirty_rect):
+        """Update frame reveal in-place: copy warna hanya di dirty rect, pixel lain sudah benar dari frame sebelumnya
+
+        Mask hanya bertambah (pixel 255 tetap 255), jadi hasilnya sama dengan blend_reveal_frame.
+        """
+        if dirty_rect is None:
+            return frame
+        x1, y1, x2, y2 = dirty_rect
+        revealed = mask[y1:y2, x1:x2] == 255
+        np.copyto(frame[y1:y2, x1:x2], job['color_img'][y1:y2, x1:x2], where=revealed[:, :, None])
+        return frame
+
+    def _write_incremental_frames(self, job, writer):
+        """Render frame secara berurutan dengan canvas dan mask persistent - EXACT SAME LOGIC"""
+        height, width = job['height'], job['width']
+        fps = job['fps']
+        drawing_frames = job['drawing_frames']
+        pause_frames, reveal_frames = job['pause_frames'], job['reveal_frames']
+        # Posisi frame di seluruh video (untuk ETA job), fase di bawah hanya menghitung framenya sendiri
+        total_frames = self.get_total_frames(job)
+
+        # FASE 5A: SPEED DRAWING FRAMES - EXACT SAME LOGIC
+        logger.info("=== PHASE 5A: SPEED DRAWING FRAMES ===")
+        self.log_progress("Generating speed drawing frames...", "✏️")
+
+        # Canvas putih yang dipakai terus (persistent) - tiap frame hanya menambah titik baru.
+        # Titik digambar dengan urutan yang sama seperti sebelumnya, jadi hasilnya pixel-identical.
+        canvas = np.full((height, width, 3), job['background_color_bgr'], dtype=np.uint8)
+        drawn_points = 0
+
+        for i in range(drawing_frames):
+            progress = (i + 1) / drawing_frames * 50  # 50% untuk speed drawing
+            print(f"\r   Speed Drawing Progress: {progress:.1f}% ({i+1}/{drawing_frames})", end="")
+            self.notify_progress(phase="Speed Drawing", current=i + 1, total=drawing_frames,
+                                 frame=i + 1, total_frames=total_frames)
+
+            drawn_points = self.advance_drawing_canvas(job, canvas, drawn_points, i)
+            writer.write_frame(canvas)
+
+        # Frame terakhir speed drawing (garis lengkap): lanjutkan canvas yang sama dengan sisa titik
+        final_drawing_canvas = canvas
+        self.draw_pencil_range(job, final_drawing_canvas, drawn_points, len(job['all_drawing_points']))
+
+        # Frame hold dikirim sebagai satu frame yang diulang, bukan ditulis berkali-kali
+        writer.write_repeated(final_drawing_canvas, pause_frames)
+
+        # FASE 5B: PAINT REVEAL FRAMES - Only if full mode
+        if job['animation_mode'] == 'full':
+            # FASE 5B: PAINT REVEAL FRAMES - EXACT SAME LOGIC
+            print(f"\n🎨 Generating paint reveal frames ({job['selected_style']['name']})...")
+            mask = np.zeros((height, width), dtype=np.uint8)
+            # Satu buffer output persistent - tiap frame hanya pixel baru di dirty rect yang di-update
+            reveal_frame = final_drawing_canvas.copy()
+
+            for i in range(reveal_frames):
+                progress = 50 + (i + 1) / reveal_frames * 50  # 50-100% untuk paint reveal
+                print(f"\r   Paint Reveal Progress: {progress:.1f}% ({i+1}/{reveal_frames})", end="")
+                self.notify_progress(phase="Paint Reveal", current=i + 1, total=reveal_frames,
+                                     frame=drawing_frames + pause_frames + i + 1, total_frames=total_frames)
+
+                dirty_rect = self.advance_reveal_mask(job, mask, i)
+                writer.write_frame(self.composite_reveal_frame(job, mask, reveal_frame, dirty_rect))
+
+            # Frame terakhir (gambar warna penuh) - EXACT SAME, tahan 1 detik
+            writer.write_repeated(job['color_img'], fps)
+        else:
+            # Drawing only mode - no paint reveal, just hold the final drawing
+            print(f"\n✏️ Drawing only mode - holding final frame...")
+            # Tidak perlu hold tambahan karena sudah dihitung di pause_frames
+
+    def _write_timemap_frames(self, job, writer):
+        """Render frame dari time map: tiap frame = satu perbandingan vektor + masked copy"""
+        logger.info("=== PHASE 5: BUILDING REVEAL TIME MAPS ===")
+        self.log_progress("Menghitung reveal time map...", "🗺️")
+        self.build_timemaps(job)
+
+        drawing_frames, pause_frames = job['drawing_frames'], job['pause_frames']
+        reveal_start = drawing_frames + pause_frames
+        total_frames = self.get_total_frames(job)
+        for i, frame in enumerate(self.render_frames(job, 0, drawing_frames)):
+            self.log_phase_progress("Time Map Render", i + 1, total_frames)
+            writer.write_frame(frame)
+        writer.write_repeated(job['final_drawing_canvas'], pause_frames)
+
+        if job['animation_mode'] == 'full':
+            for i, frame in enumerate(self.render_frames(job, reveal_start, reveal_start + job['reveal_frames'])):
+                self.log_phase_progress("Time Map Render", reveal_start + i + 1, total_frames)
+                writer.write_frame(frame)
+            writer.write_repeated(job['color_img'], job['fps'])
+        self.log_phase_progress("Time Map Render", total_frames, total_frames)
+        print()
+
+    def _write_parallel_frames(self, job, writer, workers, renderer):
+        """Render frame di process pool, frame dikirim ke writer sesuai urutan"""
+        logger.info(f"=== PHASE 5: PARALLEL FRAME RENDERING ({workers or os.cpu_count()} workers) ===")
+        self.log_progress(f"Parallel render dengan {workers or os.cpu_count()} proses...", "⚡")
+        if renderer == 'timemap':
+            self.build_timemaps(job)
+
+        total_frames = self.get_total_frames(job)
+        parallel_renderer = ParallelFrameRenderer(self, job, workers=workers, renderer=renderer)
+        for frame, count in parallel_renderer.iter_frame_runs():
+            writer.write_repeated(frame, count)
+            self.log_phase_progress("Parallel Render", writer.frames_written, total_frames)
+        print()
+
+    def _encode_parallel_segments(self, job, output_path, encoder, workers, renderer, frame_queue_size=0):
+        """Render + encode segment timeline (kelipatan GOP) di beberapa proses, lalu concat tanpa re-encode"""
+        logger.info(f"=== PHASE 5: PARALLEL SEGMENT ENCODING ({workers or os.cpu_count()} workers) ===")
+        if renderer == 'timemap':
+            self.build_timemaps(job)
+
+        segment_encoder = ParallelSegmentEncoder(self, job, encoder, workers=workers, renderer=renderer,
+                                                 frame_queue_size=frame_queue_size)
+        total_segments = segment_encoder.num_segments()
+        self.log_progress(f"Encode {total_segments} segment paralel (GOP {segment_encoder.gop} frame)...", "⚡")
+        frames_written = segment_encoder.encode(
+            output_path, progress=lambda done: self.log_phase_progress("Segment Encode", done, total_segments))
+        print()
+        return frames_written
+
+    # === STILL FRAME / THUMBNAIL ===
+    def resolve_frame_index(self, job, frame=None, time=None, position=None):
+        """Index frame global dari nomor frame, waktu (detik) atau posisi ('final', 'drawing_end', 'mid_reveal')"""
+        total_frames = self.get_total_frames(job)
+        reveal_start = job['drawing_frames'] + job['pause_frames']
+        if frame is not None:
+            frame_index = int(frame)
+        elif time is not None:
+            frame_index = int(float(time) * job['fps'])
+        elif position == 'final':
+            frame_index = total_frames - 1
+        elif position == 'drawing_end':
+            frame_index = reveal_start - 1
+        elif position == 'mid_reveal':
+            if job['animation_mode'] == 'full':
+                frame_index = reveal_start + job['reveal_frames'] // 2
+            else:
+                frame_index = job['drawing_frames'] // 2
+        else:
+            raise ValueError(f"Unknown frame position: {position}")
+        return min(max(frame_index, 0), total_frames - 1)
+
+    def render_still_frame(self, job, frame_index):
+        """Hitung satu frame (index global) tanpa render/encode video - sama dengan frame renderer incremental"""
+        total_frames = self.get_total_frames(job)
+        if frame_index < 0 or frame_index >= total_frames:
+            raise IndexError(f"Frame {frame_index} di luar range (total {total_frames})")
+        drawing_frames = job['drawing_frames']
+        reveal_start = drawing_frames + job['pause_frames']
+        # Frame hold warna setelah reveal tidak bergantung pada canvas drawing
+        if frame_index >= reveal_start + job['reveal_frames']:
+            return job['color_img'].copy()
+
+        canvas = np.full((job['height'], job['width'], 3), job['background_color_bgr'], dtype=np.uint8)
+        drawn_points = 0
+        for i in range(min(frame_index + 1, drawing_frames)):
+            drawn_points = self.advance_drawing_canvas(job, canvas, drawn_points, i)
+        if frame_index < drawing_frames:
+            return canvas
+
+        self.draw_pencil_range(job, canvas, drawn_points, len(job['all_drawing_points']))
+        if frame_index < reveal_start:
+            return canvas
+
+        mask = np.zeros((job['height'], job['width']), dtype=np.uint8)
+        for i in range(frame_index - reveal_start + 1):
+            self.advance_reveal_mask(job, mask, i)
+        return self.blend_reveal_frame(job, mask, canvas)
+
+    def create_still_frame(self, line_art_path, color_image_path, style_choice, drawing_duration, reveal_duration, fps,
+                           reveal_area_multiplier=1.0, animation_mode='full', line_color=None, background_color=None,
+                           line_renderer='circles', path_cache=None, seed=None, frame=None, time=None,
+                           position='mid_reveal', max_side=None):
+        """Buat satu frame animasi (BGR) tanpa membuat video - untuk poster/thumbnail
+
+        Frame dipilih lewat frame (index), time (detik) atau position. max_side merender langsung
+        di resolusi kecil (seperti preview). Style random hanya sama dengan video jika seed sama.
+        """
+        if style_choice not in PAINT_STYLES:
+            raise ValueError(f"style_choice must be one of {', '.join(str(style) for style in PAINT_STYLES)}")
+        if max_side is not None and max_side <= 0:
+            raise ValueError("max_side must be a positive integer")
+        try:
+            job = self.prepare_render_job(line_art_path, color_image_path, style_choice, drawing_duration,
+                                          reveal_duration, fps, reveal_area_multiplier, animation_mode,
+                                          line_color, background_color, line_renderer, path_cache, seed)
+            if max_side:
+                self.scale_render_job(job, max_side)
+            frame_index = self.resolve_frame_index(job, frame, time, position)
+            self.log_progress(f"Render still frame {frame_index + 1}/{self.get_total_frames(job)}", "🖼️")
+            return self.render_still_frame(job, frame_index)
+        except Exception as e:
+            logger.error(f"Error in create_still_frame: {e}")
+            raise
+
     # === MAIN ANIMATION FUNCTION - EXACT SAME LOGIC ===
-    def create_combined_animation(self, line_art_path, color_image_path, output_path, style_choice, 
+    def create_combined_animation(self, line_art_path, color_image_path, output_path, style_choice,
                                 drawing_duration, reveal_duration, fps, reveal_area_multiplier=1.0, animation_mode='full',
-                                line_color=None, background_color=None):
-        """Buat animasi gabungan speed drawing + paint reveal - EXACT SAME dari script asli"""
-        
+                                line_color=None, background_color=None, streaming=True, renderer='incremental',
+                                workers=1, line_renderer='circles', cache=None, path_cache=None, seed=None,
+                                preview=False, encoder_profile=None, encoder_settings=None, encode_mode='single',
+                                frame_queue_size=FRAME_QUEUE_SIZE):
+        """Buat animasi gabungan speed drawing + paint reveal - EXACT SAME dari script asli
+
+        streaming=True mengirim frame langsung ke ffmpeg tanpa file PNG temporary;
+        streaming=False memakai cara lama (PNG di folder temporary + moviepy).
+        renderer='incremental' menggambar frame berurutan (pixel-identical dengan script asli);
+        renderer='timemap' merender tiap frame dari reveal time map (pixel di tepi anti-aliasing
+        garis pensil langsung tampil dengan nilai akhirnya).
+        workers > 1 (atau None = semua core) merender chunk frame di process pool.
+        line_renderer='circles' menggambar satu titik pensil per titik skeleton (EXACT SAME);
+        line_renderer='polyline' menggambar potongan kontur baru dengan satu panggilan cv2.polylines.
+        cache (RenderCache) dipakai untuk mengambil/menyimpan MP4 dengan input dan setting yang sama.
+        path_cache (PathCache) menyimpan skeleton dan jalur gambar per line art untuk render berikutnya.
+        seed (int) membuat paint reveal deterministik: input + setting + seed sama = video sama persis.
+        preview=True merender versi kecil (maks PREVIEW_MAX_SIDE px, PREVIEW_MAX_FPS fps)
+        dari job yang sama (seed sama), untuk mencoba setting sebelum render final.
+        encoder_profile ('preview', 'standard', 'archive'; default sesuai mode) + encoder_settings
+        (override preset/crf/bitrate/threads/tune) mengatur encoder H.264.
+        encode_mode='segments' membagi timeline jadi segment kelipatan GOP yang di-render + encode
+        bersamaan di beberapa proses (workers; None = semua core), lalu digabung tanpa re-encode;
+        'single' memakai satu encoder untuk seluruh video.
+        frame_queue_size > 0 menjalankan encoder di thread terpisah dengan antrian buffer frame terbatas,
+        render frame berikutnya tidak menunggu frame sebelumnya selesai ditulis.
+        """
+
+        writer = None
         try:
             logger.info("=== STARTING ANIMATION CREATION ===")
             self.log_progress("MEMULAI PROSES ANIMASI...", "🚀")
-            
-            # === FASE 1: PERSIAPAN DATA SPEED DRAWING ===
-            logger.info("=== PHASE 1: SPEED DRAWING PREPARATION ===")
-            self.log_progress("Memproses line art untuk speed drawing...", "📐")
-            binary = self.load_and_preprocess(line_art_path)
-            skeleton = self.skeletonize_image(binary)
-            paths = self.extract_drawing_path(skeleton)
-            
-            # Gabungkan semua titik ke dalam list tunggal - EXACT SAME
-            all_drawing_points = []
-            for path in paths:
-                for pt in path:
-                    all_drawing_points.append(tuple(pt))
-            
-            self.log_progress(f"Ditemukan {len(all_drawing_points)} titik untuk speed drawing", "✅")
-            
-            # === FASE 2: LOAD GAMBAR ===
-            logger.info("=== PHASE 2: LOADING IMAGES ===")
-            self.log_progress("Loading gambar...", "📂")
-            line_art = cv2.imread(line_art_path)
-            color_img = cv2.imread(color_image_path)
-            
-            if line_art is None or color_img is None:
-                raise ValueError("Failed to load images")
-            
-            # Resize color image to match line art
-            color_img = cv2.resize(color_img, (line_art.shape[1], line_art.shape[0]))
-            height, width = line_art.shape[:2]
-            
-            self.log_progress(f"Resolusi: {width}x{height}", "📐")
-            
-            # === FASE 3: SETUP PARAMETER ===
-            logger.info("=== PHASE 3: PARAMETER SETUP ===")
-            scale = (width * height) / (1920 * 1080)
-            base_stroke_thickness = max(10, int(150 * scale))
-            base_step_size = max(10, int(150 * scale))
-            
-            # Apply reveal area multiplier
-            stroke_thickness = max(10, int(base_stroke_thickness * reveal_area_multiplier))
-            step_size = max(10, int(base_step_size * reveal_area_multiplier))
-            
-            drawing_frames = int(drawing_duration * fps)
-            reveal_frames = int(reveal_duration * fps)
-            
-            total_frames = drawing_frames + reveal_frames
-            
-            self.log_progress(f"Stroke thickness: {stroke_thickness}", "🖌️")
-            self.log_progress(f"Reveal area multiplier: {reveal_area_multiplier}x", "📏")
-            self.log_progress(f"Speed drawing frames: {drawing_frames}", "🎬")
-            self.log_progress(f"Paint reveal frames: {reveal_frames}", "🎨")
-            self.log_progress(f"Total frames: {total_frames}", "📊")
-            
-            # === PARSE COLOR SETTINGS FOR DRAWING ONLY MODE ===
-            if animation_mode == 'drawing_only' and line_color and background_color:
-                # Convert hex colors to BGR for OpenCV
-                line_color_bgr = self._hex_to_bgr(line_color)
-                background_color_bgr = self._hex_to_bgr(background_color)
-                self.log_progress(f"Line color: {line_color} -> BGR{line_color_bgr}", "🎨")
-                self.log_progress(f"Background color: {background_color} -> BGR{background_color_bgr}", "🖼️")
-            else:
-                line_color_bgr = (60, 60, 60)  # Default dark gray
-                background_color_bgr = (255, 255, 255)  # Default white
-            
-            # === FASE 4: PERSIAPAN DATA PAINT REVEAL ===
-            # Skip paint reveal preparation if drawing only mode
-            if animation_mode == 'full':
-                logger.info("=== PHASE 4: PAINT REVEAL PREPARATION ===")
-                self.log_progress("Mempersiapkan data paint reveal...", "🎨")
-                selected_style = PAINT_STYLES[style_choice]
-                
-                if style_choice == 1:
-                    paint_data, per_frame = self.classic_stroke(width, height, step_size, reveal_frames)
-                elif style_choice == 2:
-                    paint_data, per_frame = self.chaotic_scribble(width, height, step_size, reveal_frames)
-                elif style_choice == 3:
-                    paint_data, per_frame, brush_texture = self.textured_brush(width, height, step_size, stroke_thickness, reveal_frames)
-                elif style_choice == 4:
-                    paint_data, per_frame = self.random_line_following(all_drawing_points, width, height, step_size, reveal_frames)
-                elif style_choice == 5:
-                    paint_data, per_frame = self.line_art_following(all_drawing_points, width, height, step_size, reveal_frames)
-                
-                self.log_progress(f"Data paint reveal siap: {len(paint_data)} titik", "✅")
-            else:
-                logger.info("=== PHASE 4: SKIPPING PAINT REVEAL (DRAWING ONLY MODE) ===")
-                self.log_progress("Mode: Speed Drawing Only - skipping paint reveal preparation", "✏️")
-                selected_style = {"name": "drawing_only"}
-            
+
+            if encoder_profile is None:
+                encoder_profile = 'preview' if preview else 'standard'
+            encoder = resolve_encoder_settings(encoder_profile, encoder_settings)
+
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.make_key(color_image_path, line_art_path, {
+                    'style_choice': style_choice, 'drawing_duration': drawing_duration,
+                    'reveal_duration': reveal_duration, 'fps': fps,
+                    'reveal_area_multiplier': reveal_area_multiplier, 'animation_mode': animation_mode,
+                    'line_color': line_color, 'background_color': background_color,
+                    'line_renderer': line_renderer, 'renderer': renderer, 'seed': seed,
+                    'preview': preview, 'encoder': encoder, 'encode_mode': encode_mode
+                })
+                if cache.fetch(cache_key, output_path):
+                    self.log_progress("Video diambil dari render cache!", "⚡")
+                    return True
+
+            if preview:
+                # Frame preview kecil: pool process tidak sebanding dengan overhead-nya
+                fps = min(fps, PREVIEW_MAX_FPS)
+                workers = 1
+                encode_mode = 'single'
+                self.log_progress(f"Mode preview: maks {PREVIEW_MAX_SIDE}px, {fps} fps", "🔍")
+
+            job = self.prepare_render_job(line_art_path, color_image_path, style_choice, drawing_duration,
+                                          reveal_duration, fps, reveal_area_multiplier, animation_mode,
+                                          line_color, background_color, line_renderer, path_cache, seed)
+            if preview:
+                self.scale_render_job(job, PREVIEW_MAX_SIDE)
+
             # === FASE 5: GENERATE FRAMES ===
             logger.info("=== PHASE 5: FRAME GENERATION ===")
             self.log_progress("Generating frames...", "🎬")
-            temp_dir = tempfile.mkdtemp()
-            frame_paths = []
-            
-            # FASE 5A: SPEED DRAWING FRAMES - EXACT SAME LOGIC
-            logger.info("=== PHASE 5A: SPEED DRAWING FRAMES ===")
-            self.log_progress("Generating speed drawing frames...", "✏️")
-            drawing_step = max(1, len(all_drawing_points) // drawing_frames)
-            
-            for i in range(drawing_frames):
-                progress = (i + 1) / drawing_frames * 50  # 50% untuk speed drawing
-                print(f"\r   Speed Drawing Progress: {progress:.1f}% ({i+1}/{drawing_frames})", end="")
-                
-                # Canvas putih
-                canvas = np.full((height, width, 3), background_color_bgr, dtype=np.uint8)
-                
-                # Gambar titik-titik yang sudah dilalui dengan style pensil natural (TIDAK TERPENGARUH area multiplier)
-                points_to_draw = all_drawing_points[:i * drawing_step]
-                for pt in points_to_draw:
-                    # Thin pencil dengan anti-aliasing untuk smooth line (ukuran tetap)
-                    cv2.circle(canvas, pt, radius=1, color=line_color_bgr, thickness=0, lineType=cv2.LINE_AA)
-                
-                frame_path = os.path.join(temp_dir, f"frame_{i:05d}.png")
-                cv2.imwrite(frame_path, canvas)
-                frame_paths.append(frame_path)
-            
-            # Frame terakhir speed drawing (garis lengkap) dengan style pensil natural (TIDAK TERPENGARUH area multiplier)
-            final_drawing_canvas = np.full((height, width, 3), background_color_bgr, dtype=np.uint8)
-            for pt in all_drawing_points:
-                # Thin pencil dengan anti-aliasing untuk smooth line (ukuran tetap)
-                cv2.circle(final_drawing_canvas, pt, radius=1, color=line_color_bgr, thickness=0, lineType=cv2.LINE_AA)
-            
-            # Tahan frame terakhir speed drawing sebentar - EXACT SAME
-            pause_frames = fps // 2 if animation_mode == 'full' else fps * 2  # 0.5s for full mode, 2s for drawing only
-            
-            # Untuk drawing only mode, hitung pause frames supaya total durasi sesuai user input
-            if animation_mode == 'drawing_only':
-                target_total_frames = int(drawing_duration * fps)
-                remaining_frames = max(0, target_total_frames - drawing_frames)
-                pause_frames = remaining_frames
-            
-            for j in range(pause_frames):
-                frame_path = os.path.join(temp_dir, f"frame_{drawing_frames + j:05d}.png")
-                cv2.imwrite(frame_path, final_drawing_canvas)
-                frame_paths.append(frame_path)
-            
-            # FASE 5B: PAINT REVEAL FRAMES - Only if full mode
-            if animation_mode == 'full':
-                # FASE 5B: PAINT REVEAL FRAMES - EXACT SAME LOGIC
-                print(f"\n🎨 Generating paint reveal frames ({selected_style['name']})...")
-                mask = np.zeros((height, width), dtype=np.uint8)
-                
-                for i in range(reveal_frames):
-                    progress = 50 + (i + 1) / reveal_frames * 50  # 50-100% untuk paint reveal
-                    print(f"\r   Paint Reveal Progress: {progress:.1f}% ({i+1}/{reveal_frames})", end="")
-                    
-                    start_index = i * per_frame
-                    end_index = min(start_index + per_frame, len(paint_data))
-                    points_to_draw = paint_data[start_index:end_index]
-                    
-                    if points_to_draw:
-                        if style_choice == 3:  # Textured Brush
-                            for pt in points_to_draw:
-                                brush_h, brush_w = brush_texture.shape
-                                y1, y2 = max(0, pt[1] - brush_h//2), min(height, pt[1] + brush_h//2)
-                                x1, x2 = max(0, pt[0] - brush_w//2), min(width, pt[0] + brush_w//2)
-                                if y2 > y1 and x2 > x1:
-                                    mask_roi = mask[y1:y2, x1:x2]
-                                    brush_resized = cv2.resize(brush_texture, (mask_roi.shape[1], mask_roi.shape[0]))
-                                    np.maximum(mask_roi, brush_resized, out=mask_roi)
-                        elif style_choice == 1:  # Classic Stroke
-                            for j in range(len(points_to_draw) - 1):
-                                pt1 = points_to_draw[j]
-                                pt2 = points_to_draw[j+1]
-                                cv2.line(mask, pt1, pt2, 255, stroke_thickness, lineType=cv2.LINE_AA)
-                        elif style_choice == 2:  # Chaotic Scribble
-                            for pt in points_to_draw:
-                                cv2.circle(mask, pt, stroke_thickness // 2, 255, -1)
-                        elif style_choice == 4:  # Random Line Following
-                            for pt in points_to_draw:
-                                cv2.circle(mask, pt, stroke_thickness // 3, 255, -1)
-                        elif style_choice == 5:  # Line Art Following
-                            for pt in points_to_draw:
-                                cv2.circle(mask, pt, stroke_thickness // 3, 255, -1)
-                    
-                    # Blend dengan color image - EXACT SAME
-                    mask_3ch = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
-                    blended = np.where(mask_3ch == 255, color_img, final_drawing_canvas)
-                    
-                    frame_path = os.path.join(temp_dir, f"frame_{drawing_frames + pause_frames + i:05d}.png")
-                    cv2.imwrite(frame_path, blended)
-                    frame_paths.append(frame_path)
-                
-                # Frame terakhir (gambar warna penuh) - EXACT SAME
-                for j in range(fps):  # Tahan 1 detik
-                    frame_path = os.path.join(temp_dir, f"frame_{drawing_frames + pause_frames + reveal_frames + j:05d}.png")
-                    cv2.imwrite(frame_path, color_img)
-                    frame_paths.append(frame_path)
+            if encode_mode == 'segments':
+                frames_written = self._encode_parallel_segments(job, output_path, encoder, workers, renderer,
+                                                                frame_queue_size)
             else:
-                # Drawing only mode - no paint reveal, just hold the final drawing
-                print(f"\n✏️ Drawing only mode - holding final frame...")
-                # Tidak perlu hold tambahan karena sudah dihitung di pause_frames
-                pass
-            
+                if streaming:
+                    self.log_progress("Mode streaming: frame langsung dikirim ke encoder H.264", "📡")
+                    writer = FFmpegFrameWriter(output_path, job['width'], job['height'], fps, **encoder)
+                else:
+                    writer = PngSequenceWriter(output_path, fps, **encoder)
+                if frame_queue_size:
+                    writer = PipelinedFrameWriter(writer, frame_queue_size)
+
+                if workers is None or workers > 1:
+                    self._write_parallel_frames(job, writer, workers, renderer)
+                elif renderer == 'timemap':
+                    self._write_timemap_frames(job, writer)
+                else:
+                    self._write_incremental_frames(job, writer)
+                frames_written = writer.frames_written
+
             # === FASE 6: CREATE VIDEO ===
             logger.info("=== PHASE 6: CREATING VIDEO ===")
-            logger.info(f"Total frames to process: {len(frame_paths)}")
+            logger.info(f"Total frames to process: {frames_written}")
             self.log_progress(f"Creating video: {os.path.basename(output_path)}", "🎥")
-            
+
             try:
-                logger.info("Creating ImageSequenceClip...")
-                clip = ImageSequenceClip(frame_paths, fps=fps)
-                logger.info(f"Clip duration: {clip.duration} seconds")
-                logger.info("Starting video encoding...")
                 self.log_progress("Encoding video dengan H.264...", "⚙️")
-                clip.write_videofile(output_path, codec="libx264", verbose=False, logger=None)
+                finished_writer, writer = writer, None
+                if finished_writer is not None:
+                    finished_writer.close()
                 logger.info("Video encoding completed successfully")
+                if cache_key is not None:
+                    cache.store(cache_key, output_path)
                 self.log_progress("Video berhasil dibuat!", "🎉")
                 return True
             finally:
-                # Cleanup temporary files
-                logger.info("Cleaning up temporary files...")
-                self.log_progress("Cleaning up temporary files...", "🧹")
-                for path in frame_paths:
-                    try:
-                        os.remove(path)
-                    except OSError:
-                        logger.warning(f"Failed to remove temp file: {path}")
-                try:
-                    os.rmdir(temp_dir)
-                except OSError:
-                    logger.warning(f"Failed to remove temp directory: {temp_dir}")
-                
                 logger.info("Animation creation process completed")
                 self.log_progress("Proses selesai!", "✅")
-            
+
         except Exception as e:
             logger.error("=== ANIMATION CREATION ERROR ===")
             logger.error(f"Error type: {type(e).__name__}")
@@ -561,4 +1153,6 @@ class AnimationCreator:
             import traceback
             logger.error(traceback.format_exc())
             self.log_progress(f"TERJADI ERROR: {e}", "❌")
-            return False
\ No newline at end of file
+            if writer is not None:
+                writer.abort()
+            return False
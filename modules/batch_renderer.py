@@ -0,0 +1,89 @@
+"""
+Batch Renderer Module
+Render banyak animasi sekaligus di process pool (satu file per proses)
+Hasil tiap item dikembalikan begitu selesai, tidak menunggu seluruh batch
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import os
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def render_animation(render_kwargs):
+    """Render satu animasi di worker process, return True jika berhasil"""
+    from modules.animation_creator import AnimationCreator
+    return AnimationCreator().create_combined_animation(**render_kwargs)
+
+
+class BatchRenderer:
+    """Process pool bersama untuk render batch, jumlah render bersamaan dibatasi max_concurrency"""
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """Buat pool saat pertama dipakai (worker hidup terus antar request)"""
+        with self._lock:
+            if self._pool is None:
+                # Spawn, bukan fork: server punya thread aktif (Flask, job render, batcher inference)
+                # yang lock-nya bisa ikut tersalin dalam keadaan terkunci ke proses hasil fork
+                self._pool = ProcessPoolExecutor(max_workers=self.max_concurrency,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def _reset_pool(self, broken_pool=None):
+        """Buang pool yang rusak (worker crash) supaya batch berikutnya membuat pool baru
+
+        broken_pool: pool asal future yang rusak; pool hanya dibuang jika masih pool aktif, supaya pool baru
+        yang sudah dibuat batch lain tidak ikut dimatikan (None = buang pool aktif, untuk shutdown).
+        """
+        with self._lock:
+            if broken_pool is not None and self._pool is not broken_pool:
+                return
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def iter_results(self, items):
+        """Render items = [(key, render_kwargs), ...], yield (key, success, error) sesuai urutan selesai"""
+        if self.max_concurrency > 1:
+            # Satu file per proses sudah memakai semua core, render frame di dalamnya tidak perlu pool lagi
+            items = [(key, dict(render_kwargs, workers=1)) for key, render_kwargs in items]
+
+        pool = self._get_pool()
+        futures = {pool.submit(render_animation, render_kwargs): key for key, render_kwargs in items}
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    success = future.result()
+                    yield key, success, None if success else 'Animation creation failed'
+                except BrokenProcessPool as e:
+                    logger.error(f"Batch worker crashed while rendering {key}: {e}")
+                    self._reset_pool(pool)
+                    yield key, False, f'Render worker crashed: {e}'
+                except Exception as e:
+                    logger.error(f"Batch render error for {key}: {e}")
+                    yield key, False, str(e)
+        finally:
+            # Client putus di tengah stream: batalkan item yang belum mulai
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        """Hentikan semua worker"""
+        self._reset_pool()
@@ -0,0 +1,189 @@
+"""
+Inference Batcher Module
+Gabungkan request inference ONNX yang datang bersamaan menjadi satu batch tensor
+Request ditampung selama max_wait detik, dikelompokkan per ukuran (bucket), di-pad ke ukuran terbesar
+di kelompoknya, dijalankan dengan satu session.run lalu hasilnya dipotong dan dikembalikan ke tiap pemanggil
+"""
+
+from concurrent.futures import Future, TimeoutError
+import numpy as np
+import threading
+import queue
+import time
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def is_batch_size_error(error):
+    """True jika error onnxruntime karena dimensi batch (index 0) model fixed, bukan error sementara/input"""
+    message = str(error)
+    return 'invalid dimensions' in message and 'index: 0' in message
+
+
+class InferenceBatcher:
+    """Thread batching untuk run_batch(batch) dengan batch (N, C, H, W) float32 -> output (N, C_out, H', W')
+
+    Gambar dengan ukuran sama dijalankan tanpa padding (hasil sama dengan inference satu per satu);
+    gambar beda ukuran dalam bucket size_multiple yang sama di-pad (edge) ke ukuran terbesar di batch.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait=0.01, size_multiple=64, max_batch_pixels=8 * 1024 * 1024,
+                 timeout=300.0):
+        self.run_batch = run_batch
+        # Batas waktu menunggu hasil satu input (detik, None = tanpa batas)
+        self.timeout = timeout
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.size_multiple = size_multiple
+        self.max_batch_pixels = max_batch_pixels
+        self._requests = queue.Queue()
+        # Request yang tidak muat di batch sebelumnya (batas pixel), jadi request pertama batch berikutnya
+        self._carry = None
+        self._thread = threading.Thread(target=self._loop, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, array):
+        """Antrikan satu input (C, H, W), return Future berisi output (C_out, H', W')"""
+        if array.ndim != 3:
+            raise ValueError(f"Input must have shape (C, H, W), got {array.shape}")
+        future = Future()
+        self._requests.put((array, future))
+        return future
+
+    def wait(self, future):
+        """Tunggu hasil Future dari submit maksimal timeout detik (TimeoutError jika lewat)"""
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Belum dijalankan: keluarkan dari batch berikutnya
+            future.cancel()
+            raise TimeoutError(f"Inference did not finish within {self.timeout} s")
+
+    def infer(self, array):
+        """Inference satu input, tunggu sampai batch-nya selesai"""
+        return self.wait(self.submit(array))
+
+    def _collect(self):
+        """Tunggu request pertama, lalu kumpulkan request lain sampai max_wait habis atau batch penuh
+
+        Pixel dihitung per bucket termasuk padding (jumlah x tinggi terbesar x lebar terbesar), karena tiap
+        bucket dijalankan sebagai satu batch tensor. Request yang melebihi max_batch_pixels disimpan untuk batch
+        berikutnya; request pertama selalu diterima.
+        """
+        request, self._carry = self._carry, None
+        if request is None:
+            request = self._requests.get()
+        requests, buckets = [], {}
+        self._accept(request, requests, buckets)
+        deadline = time.monotonic() + self.max_wait
+        while len(requests) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if self._padded_pixels(request[0], buckets) > self.max_batch_pixels:
+                self._carry = request
+                break
+            self._accept(request, requests, buckets)
+        return requests
+
+    def _padded_pixels(self, array, buckets):
+        """Jumlah pixel batch tensor bucket array jika array ditambahkan ke bucket itu"""
+        height, width = array.shape[1:]
+        bucket_height, bucket_width, count = buckets.get(self._bucket(array), (0, 0, 0))
+        return (count + 1) * max(height, bucket_height) * max(width, bucket_width)
+
+    def _accept(self, request, requests, buckets):
+        """Masukkan request ke batch dan update ukuran padding bucket-nya"""
+        height, width = request[0].shape[1:]
+        key = self._bucket(request[0])
+        bucket_height, bucket_width, count = buckets.get(key, (0, 0, 0))
+        buckets[key] = (max(height, bucket_height), max(width, bucket_width), count + 1)
+        requests.append(request)
+
+    def _bucket(self, array):
+        """Key bucket: ukuran dibulatkan ke atas ke kelipatan size_multiple"""
+        height, width = array.shape[1:]
+        return tuple(-(-size // self.size_multiple) * self.size_multiple for size in (height, width))
+
+    def _loop(self):
+        """Loop thread batcher - error di satu batch dikirim ke Future batch itu, thread tetap jalan"""
+        while True:
+            requests = self._collect()
+            try:
+                buckets = {}
+                for request in requests:
+                    buckets.setdefault(self._bucket(request[0]), []).append(request)
+            except Exception as e:
+                self._fail(requests, e)
+                continue
+            for bucket_requests in buckets.values():
+                try:
+                    self._run_bucket(bucket_requests)
+                except Exception as e:
+                    self._fail(bucket_requests, e)
+
+    def _fail(self, requests, error):
+        """Kirim error ke semua Future yang belum selesai supaya pemanggil tidak menunggu selamanya"""
+        logger.error(f"Batched inference error: {error}")
+        for _, future in requests:
+            if not future.done():
+                future.set_exception(error)
+
+    def _run_bucket(self, requests):
+        """Jalankan satu batch (ukuran dalam satu bucket), kirim hasil yang sudah dipotong ke tiap Future"""
+        requests = [(array, future) for array, future in requests if future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        height = max(array.shape[1] for array, _ in requests)
+        width = max(array.shape[2] for array, _ in requests)
+        batch = np.empty((len(requests), requests[0][0].shape[0], height, width), dtype=np.float32)
+        for index, (array, _) in enumerate(requests):
+            array_height, array_width = array.shape[1:]
+            batch[index, :, :array_height, :array_width] = array
+            # Pad edge: ulangi baris/kolom terakhir supaya tepi gambar tidak dianggap garis
+            batch[index, :, array_height:, :array_width] = array[:, -1:, :]
+            batch[index, :, :, array_width:] = batch[index, :, :, array_width - 1:array_width]
+
+        try:
+            output = self.run_batch(batch)
+        except Exception as e:
+            if len(requests) == 1:
+                requests[0][1].set_exception(e)
+                return
+            if is_batch_size_error(e):
+                # Model tidak menerima batch > 1 (dimensi batch fixed): jalankan satu per satu seterusnya
+                logger.warning(f"Model rejects batches ({e}), falling back to batch size 1")
+                self.max_batch_size = 1
+            else:
+                # Error lain (mis. kehabisan memory, satu input rusak): ulangi batch ini satu per satu saja,
+                # error hanya dikirim ke input yang memang gagal dan batch berikutnya tetap digabung
+                logger.warning(f"Batched inference failed ({e}), retrying {len(requests)} images one by one")
+            for request in requests:
+                self._run_single(*request)
+            return
+
+        output_height, output_width = output.shape[2:]
+        for index, (array, future) in enumerate(requests):
+            crop_height = round(array.shape[1] * output_height / height)
+            crop_width = round(array.shape[2] * output_width / width)
+            future.set_result(output[index, :, :crop_height, :crop_width].copy())
+        logger.info(f"Batched inference: {len(requests)} images at {width}x{height}")
+
+    def _run_single(self, array, future):
+        """Inference satu input tanpa batching (fallback)"""
+        try:
+            future.set_result(self.run_batch(array[np.newaxis])[0])
+        except Exception as e:
+            future.set_exception(e)
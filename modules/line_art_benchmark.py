@@ -0,0 +1,107 @@
+"""
+Line Art Benchmark Module
+Bandingkan waktu dan kualitas line art untuk beberapa resolusi inference (max_side)
+Kualitas diukur terhadap line art dari inference resolusi penuh, pada ukuran output yang sama
+Jalankan: python -m modules.line_art_benchmark foto.jpg --sizes 1024 1440 1920 2560 --repeat 3
+"""
+
+import cv2
+import numpy as np
+import argparse
+import tempfile
+import shutil
+import time
+import os
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def line_art_quality(reference, result, threshold=128):
+    """PSNR, mean abs error (0-255) dan F1 pixel garis (nilai < threshold) terhadap line art referensi"""
+    difference = reference.astype(np.float32) - result.astype(np.float32)
+    mse = float(np.mean(difference ** 2))
+    reference_lines, result_lines = reference < threshold, result < threshold
+    matched = np.count_nonzero(reference_lines & result_lines)
+    precision = matched / max(1, np.count_nonzero(result_lines))
+    recall = matched / max(1, np.count_nonzero(reference_lines))
+    return {
+        'psnr': float('inf') if mse == 0 else 10 * np.log10(255.0 ** 2 / mse),
+        'mae': float(np.mean(np.abs(difference))),
+        'line_f1': 2 * precision * recall / max(1e-9, precision + recall),
+    }
+
+
+def timed_convert(processor, input_path, output_path, max_side, repeat=1):
+    """Convert dengan max_side tertentu, return waktu tercepat dari repeat kali (detik)"""
+    processor.max_side = max_side
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if not processor.convert_to_line_art(input_path, output_path):
+            raise RuntimeError(f"Line art conversion failed at max_side={max_side}")
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_max_sides(processor, input_path, sizes, repeat=1):
+    """Jalankan benchmark untuk tiap max_side di sizes, return list dict hasil (baris pertama = referensi)
+
+    Waktu termasuk baca gambar, resize, inference dan simpan line art (sama dengan endpoint).
+    """
+    temp_dir = tempfile.mkdtemp()
+    original_max_side = processor.max_side
+    try:
+        reference_path = os.path.join(temp_dir, 'reference.png')
+        reference_seconds = timed_convert(processor, input_path, reference_path, None, repeat)
+        reference = cv2.imread(reference_path, cv2.IMREAD_GRAYSCALE)
+        results = [{'max_side': None, 'seconds': reference_seconds, 'speedup': 1.0,
+                    **line_art_quality(reference, reference)}]
+
+        for max_side in sizes:
+            output_path = os.path.join(temp_dir, f"line_art_{max_side}.png")
+            seconds = timed_convert(processor, input_path, output_path, max_side, repeat)
+            result = cv2.imread(output_path, cv2.IMREAD_GRAYSCALE)
+            results.append({'max_side': max_side, 'seconds': seconds, 'speedup': reference_seconds / seconds,
+                            **line_art_quality(reference, result)})
+        return results
+    finally:
+        processor.max_side = original_max_side
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resolusi inference line art')
+    parser.add_argument('input_path', help='Gambar input (mis. foto 12 MP)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 1440, 1920, 2560],
+                        help='Nilai max_side yang dibandingkan')
+    parser.add_argument('--repeat', type=int, default=1, help='Jumlah pengulangan per ukuran (diambil yang tercepat)')
+    parser.add_argument('--max-memory-mb', type=int, default=4096, help='Batas memory inference (tiling)')
+    args = parser.parse_args()
+
+    from modules.line_art_processor import LineArtProcessor
+    processor = LineArtProcessor(max_memory_mb=args.max_memory_mb)
+    if not processor.is_model_ready():
+        logger.error("ONNX model not loaded")
+        sys.exit(1)
+
+    height, width = cv2.imread(args.input_path).shape[:2]
+    results = benchmark_max_sides(processor, args.input_path, args.sizes, args.repeat)
+    print(f"\nInput: {args.input_path} ({width}x{height}), output line art {width}x{height}")
+    print(f"{'max_side':>10} {'seconds':>9} {'speedup':>8} {'PSNR dB':>8} {'MAE':>7} {'line F1':>8}")
+    for row in results:
+        max_side = 'full' if row['max_side'] is None else row['max_side']
+        print(f"{max_side:>10} {row['seconds']:>9.2f} {row['speedup']:>7.1f}x {row['psnr']:>8.1f} "
+              f"{row['mae']:>7.2f} {row['line_f1']:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,18 +10,116 @@ import onnxruntime as ort
 import os
 from PIL import Image
 import tempfile
+import threading
+from concurrent.futures import Future
+from collections import deque
 import logging
+from modules.inference_batcher import InferenceBatcher
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Perkiraan memory aktivasi model informative-drawings per pixel input (float32, beberapa layer 64 channel)
+INFERENCE_BYTES_PER_PIXEL = 1024
+
+# Level optimasi graph onnxruntime
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+EXECUTION_MODES = {
+    'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+    'parallel': ort.ExecutionMode.ORT_PARALLEL,
+}
+
+# Setting InferenceSession default (None = default onnxruntime, mis. thread = semua core)
+DEFAULT_SESSION_OPTIONS = {
+    'intra_op_threads': None,  # Thread per operator; set ke core / jumlah worker jika beberapa worker berbagi mesin
+    'inter_op_threads': None,  # Thread antar operator (hanya dipakai execution_mode 'parallel')
+    'execution_mode': 'sequential',
+    'allow_spinning': True,  # False = thread idle tidak busy-wait (lebih hemat CPU saat core dipakai bersama)
+    'graph_optimization': 'all',
+    'enable_mem_arena': True,
+    'enable_mem_pattern': True,
+    'optimized_model_path': None,  # File model hasil optimasi, dipakai ulang saat start berikutnya
+    'profiling': False,  # Tulis profile JSON onnxruntime (diagnostik, lihat end_profiling)
+    'profile_prefix': 'logs/line_art_profile',
+}
+
+
+def resolve_session_options(options=None):
+    """Gabungkan setting session dengan default, ValueError jika key/nilai tidak dikenal"""
+    options = options or {}
+    unknown = set(options) - set(DEFAULT_SESSION_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown session options: {', '.join(sorted(unknown))}")
+    resolved = {**DEFAULT_SESSION_OPTIONS, **options}
+    for key in ('intra_op_threads', 'inter_op_threads'):
+        if resolved[key] is not None and int(resolved[key]) < 1:
+            raise ValueError(f"{key} must be >= 1")
+    if resolved['graph_optimization'] not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"graph_optimization must be one of {', '.join(GRAPH_OPTIMIZATION_LEVELS)}")
+    if resolved['execution_mode'] not in EXECUTION_MODES:
+        raise ValueError(f"execution_mode must be one of {', '.join(EXECUTION_MODES)}")
+    return resolved
+
+
+def build_session_options(options):
+    """ort.SessionOptions dari setting yang sudah di-resolve"""
+    sess_options = ort.SessionOptions()
+    if options['intra_op_threads'] is not None:
+        sess_options.intra_op_num_threads = int(options['intra_op_threads'])
+    if options['inter_op_threads'] is not None:
+        sess_options.inter_op_num_threads = int(options['inter_op_threads'])
+    sess_options.execution_mode = EXECUTION_MODES[options['execution_mode']]
+    if not options['allow_spinning']:
+        sess_options.add_session_config_entry('session.intra_op.allow_spinning', '0')
+        sess_options.add_session_config_entry('session.inter_op.allow_spinning', '0')
+    sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[options['graph_optimization']]
+    sess_options.enable_cpu_mem_arena = bool(options['enable_mem_arena'])
+    sess_options.enable_mem_pattern = bool(options['enable_mem_pattern'])
+    if options['profiling']:
+        profile_dir = os.path.dirname(options['profile_prefix'])
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        sess_options.enable_profiling = True
+        sess_options.profile_file_prefix = options['profile_prefix']
+    return sess_options
+
+
+# Satu processor (InferenceSession) untuk seluruh proses server, dibuat saat pertama dipakai
+_processor = None
+_processor_lock = threading.Lock()
+
 class LineArtProcessor:
-    def __init__(self):
+    def __init__(self, max_batch_size=1, batch_wait=0.01, batch_timeout=300.0, tile_size=1024, tile_overlap=128, max_memory_mb=4096,
+                 max_side=None, output_max_side=None, session_options=None):
         self.session = None
+        self.batcher = None
+        self.session_options = resolve_session_options(session_options)
+        # Sisi terpanjang gambar saat inference (None = resolusi upload) dan line art yang disimpan
+        # (None = ukuran gambar asli); output model di-resize kembali ke ukuran output
+        self.max_side = max_side
+        self.output_max_side = output_max_side
+        # Gambar yang aktivasinya melebihi max_memory_mb diproses per tile (tile_size px, overlap tile_overlap px)
+        self.max_inference_pixels = max(1, int(max_memory_mb * 1024 * 1024 / INFERENCE_BYTES_PER_PIXEL))
+        if max_side and max_side * max_side > self.max_inference_pixels:
+            # Tiling gambar yang sudah dinormalisasi menambah pixel inference (overlap) + blending sambungan
+            needed_mb = max_side * max_side * INFERENCE_BYTES_PER_PIXEL // 2 ** 20
+            logger.warning(f"max_memory_mb={max_memory_mb} < {needed_mb} MB needed for {max_side}x{max_side} inference, "
+                           f"normalized images may be tiled")
+        self.tile_overlap = tile_overlap
+        # Dengan dynamic batching, tile dibatasi supaya minimal 2 tile muat dalam satu batch
+        tiles_per_batch = min(2, max(1, max_batch_size))
+        max_tile_side = int(np.sqrt(self.max_inference_pixels / tiles_per_batch)) // 32 * 32
+        self.tile_size = max(2 * tile_overlap + 32, min(tile_size, max_tile_side))
         self.model_path = "models/model.onnx"
         self.model_url = "https://huggingface.co/rocca/informative-drawings-line-art-onnx/resolve/main/model.onnx"
         self._load_model()
+        self._setup_batching(max_batch_size, batch_wait, batch_timeout)
     
     def _load_model(self):
         """Load ONNX model"""
@@ -36,16 +134,56 @@ class LineArtProcessor:
             
             # Load model
             logger.info("Loading ONNX model...")
-            self.session = ort.InferenceSession(
-                self.model_path, 
-                providers=['CPUExecutionProvider']
-            )
+            self.session = self._create_session()
             logger.info("Model loaded successfully")
             
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             self.session = None
     
+    def _create_session(self):
+        """InferenceSession dengan session options; model hasil optimasi dipakai ulang jika masih baru"""
+        optimized_path = self.session_options['optimized_model_path']
+        if optimized_path and os.path.exists(optimized_path) and \
+                os.path.getmtime(optimized_path) >= os.path.getmtime(self.model_path):
+            # Graph sudah dioptimasi saat disimpan, tidak perlu optimasi ulang (start lebih cepat)
+            sess_options = build_session_options(self.session_options)
+            sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS['disable']
+            try:
+                session = ort.InferenceSession(optimized_path, sess_options=sess_options,
+                                               providers=['CPUExecutionProvider'])
+                logger.info(f"Loaded optimized model: {optimized_path}")
+                return session
+            except Exception as e:
+                logger.warning(f"Optimized model unusable ({e}), re-optimizing from {self.model_path}")
+        
+        sess_options = build_session_options(self.session_options)
+        if optimized_path:
+            optimized_dir = os.path.dirname(optimized_path)
+            if optimized_dir:
+                os.makedirs(optimized_dir, exist_ok=True)
+            # Model hasil optimasi level 'all' bisa spesifik ke hardware: simpan per mesin, jangan dibagikan
+            sess_options.optimized_model_filepath = optimized_path
+        return ort.InferenceSession(self.model_path, sess_options=sess_options, providers=['CPUExecutionProvider'])
+    
+    def end_profiling(self):
+        """Hentikan profiling onnxruntime, return path file profile JSON (None jika profiling tidak aktif)"""
+        if self.session is None or not self.session_options['profiling']:
+            return None
+        return self.session.end_profiling()
+    
+    def _setup_batching(self, max_batch_size, batch_wait, batch_timeout):
+        """Aktifkan dynamic batching jika max_batch_size > 1 dan dimensi batch model tidak fixed 1"""
+        if self.session is None or max_batch_size <= 1:
+            return
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        if isinstance(batch_dim, int) and batch_dim == 1:
+            logger.info("Model input has fixed batch size 1, dynamic batching disabled")
+            return
+        self.batcher = InferenceBatcher(self._run_batch, max_batch_size=max_batch_size, max_wait=batch_wait,
+                                        max_batch_pixels=self.max_inference_pixels, timeout=batch_timeout)
+        logger.info(f"Dynamic batching enabled (max {max_batch_size} images, wait {batch_wait * 1000:.0f} ms)")
+    
     def _download_model(self):
         """Download model from HuggingFace"""
         try:
@@ -56,10 +194,11 @@ class LineArtProcessor:
             logger.error(f"Failed to download model: {e}")
             raise
     
-    def _blob_to_linear_rgb_array(self, image_path):
+    def _blob_to_linear_rgb_array(self, image_path, max_side=None):
         """
         Convert image to linear RGB array
         Berdasarkan fungsi blobToLinearRGBArray dari script asli
+        max_side: gambar diperkecil (INTER_AREA) jika sisi terpanjangnya melebihi max_side
         """
         try:
             # Load image
@@ -69,6 +208,11 @@ class LineArtProcessor:
             
             # Convert BGR to RGB
             img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            original_height, original_width = img.shape[:2]
+            if max_side and max(original_height, original_width) > max_side:
+                scale = max_side / max(original_height, original_width)
+                img = cv2.resize(img, (max(1, round(original_width * scale)), max(1, round(original_height * scale))),
+                                 interpolation=cv2.INTER_AREA)
             height, width = img.shape[:2]
             
             # Normalize to 0-1
@@ -80,7 +224,9 @@ class LineArtProcessor:
             return {
                 'data': rgb_data.flatten(),
                 'width': width,
-                'height': height
+                'height': height,
+                'original_width': original_width,
+                'original_height': original_height
             }
             
         except Exception as e:
@@ -108,6 +254,124 @@ class LineArtProcessor:
             logger.error(f"Error in linear_greyscale_array_to_image: {e}")
             raise
     
+    def _run_batch(self, batch):
+        """Jalankan model untuk batch tensor (N, 3, H, W), return output (N, 1, H', W')"""
+        input_tensor = ort.OrtValue.ortvalue_from_numpy(batch)
+        return self.session.run(['output'], {'input': input_tensor})[0]
+    
+    def infer(self, rgb):
+        """Output model (1, H', W') untuk satu array RGB linear (3, H, W) - lewat batcher jika aktif,
+        gambar yang melebihi batas memory diproses per tile"""
+        height, width = rgb.shape[1:]
+        if height * width > self.max_inference_pixels:
+            return self._infer_tiled(rgb)
+        if self.batcher is not None:
+            return self.batcher.infer(rgb)
+        return self._run_batch(rgb[np.newaxis])[0]
+    
+    def _result(self, future):
+        """Hasil Future dari _submit (dengan batas waktu batcher jika aktif)"""
+        if self.batcher is not None:
+            return self.batcher.wait(future)
+        return future.result()
+    
+    def _submit(self, rgb):
+        """Future berisi output model - gambar kecil lewat batcher (tidak menunggu), sisanya langsung dijalankan"""
+        height, width = rgb.shape[1:]
+        if self.batcher is not None and height * width <= self.max_inference_pixels:
+            return self.batcher.submit(rgb)
+        future = Future()
+        future.set_result(self.infer(rgb))
+        return future
+    
+    def _tile_starts(self, size, tile):
+        """Posisi awal tile sepanjang satu sumbu, tile terakhir menempel di tepi gambar"""
+        if size <= tile:
+            return [0]
+        return list(range(0, size - tile, tile - self.tile_overlap)) + [size - tile]
+    
+    def _tile_weights(self, length, has_before, has_after):
+        """Bobot blending 1D: naik/turun linear di area overlap yang bertemu tile tetangga"""
+        weights = np.ones(length, dtype=np.float32)
+        ramp = np.linspace(1.0 / (self.tile_overlap + 1), 1.0, self.tile_overlap, endpoint=False, dtype=np.float32)
+        if has_before:
+            weights[:self.tile_overlap] = ramp
+        if has_after:
+            weights[length - self.tile_overlap:] = np.minimum(weights[length - self.tile_overlap:], ramp[::-1])
+        return weights
+    
+    def _infer_tiled(self, rgb):
+        """Inference per tile dengan overlap, output digabung dengan weighted blending (tanpa sambungan)
+
+        Memory aktivasi dibatasi ukuran tile, tidak tergantung ukuran gambar input.
+        """
+        height, width = rgb.shape[1:]
+        tile_height, tile_width = min(self.tile_size, height), min(self.tile_size, width)
+        ys = self._tile_starts(height, tile_height)
+        xs = self._tile_starts(width, tile_width)
+        logger.info(f"Tiled inference: {len(ys) * len(xs)} tiles of {tile_width}x{tile_height} for {width}x{height}")
+        
+        output = np.zeros((1, height, width), dtype=np.float32)
+        weight_sum = np.zeros((height, width), dtype=np.float32)
+        
+        def accumulate(y, x, future):
+            tile_output = self._result(future)
+            if tile_output.shape[1:] != (tile_height, tile_width):
+                tile_output = cv2.resize(tile_output[0], (tile_width, tile_height))[np.newaxis]
+            weights = np.outer(self._tile_weights(tile_height, y > 0, y + tile_height < height),
+                               self._tile_weights(tile_width, x > 0, x + tile_width < width))
+            output[:, y:y + tile_height, x:x + tile_width] += tile_output * weights
+            weight_sum[y:y + tile_height, x:x + tile_width] += weights
+        
+        # Tile dikirim ke batcher (jika aktif) supaya beberapa tile jalan sebagai satu batch
+        max_pending = self.batcher.max_batch_size if self.batcher is not None else 1
+        pending = deque()
+        for y in ys:
+            for x in xs:
+                while len(pending) >= max_pending:
+                    accumulate(*pending.popleft())
+                tile = np.ascontiguousarray(rgb[:, y:y + tile_height, x:x + tile_width])
+                pending.append((y, x, self._submit(tile)))
+        while pending:
+            accumulate(*pending.popleft())
+        
+        return output / weight_sum
+    
+    def _load_input(self, input_path):
+        """Gambar input sebagai array RGB linear (3, H, W) float32 (diperkecil ke max_side) + ukuran output (w, h)"""
+        rgb_data = self._blob_to_linear_rgb_array(input_path, self.max_side)
+        rgb = rgb_data['data'].reshape(3, rgb_data['height'], rgb_data['width']).astype(np.float32)
+        output_width, output_height = rgb_data['original_width'], rgb_data['original_height']
+        if self.output_max_side and max(output_width, output_height) > self.output_max_side:
+            scale = self.output_max_side / max(output_width, output_height)
+            output_width, output_height = max(1, round(output_width * scale)), max(1, round(output_height * scale))
+        return rgb, (output_width, output_height)
+    
+    def _save_output(self, output_data, output_path, output_size=None):
+        """Simpan output model (1, H, W) sebagai gambar line art (di-resize ke output_size (w, h)),
+        return True jika berhasil"""
+        if output_size is not None and output_size != (output_data.shape[2], output_data.shape[1]):
+            output_data = np.clip(cv2.resize(output_data[0], output_size, interpolation=cv2.INTER_LINEAR), 0, 1)[np.newaxis]
+        dims = {
+            'width': output_data.shape[2],
+            'height': output_data.shape[1]
+        }
+        
+        line_art_img = self._linear_greyscale_array_to_image(
+            output_data.flatten(), dims
+        )
+        
+        # Save result
+        line_art_bgr = cv2.cvtColor(line_art_img, cv2.COLOR_RGB2BGR)
+        success = cv2.imwrite(output_path, line_art_bgr)
+        
+        if success:
+            logger.info(f"Line art saved to: {output_path}")
+            return True
+        else:
+            logger.error("Failed to save line art")
+            return False
+    
     def convert_to_line_art(self, input_path, output_path):
         """
         Convert image to line art
@@ -121,47 +385,73 @@ class LineArtProcessor:
             logger.info(f"Processing image: {input_path}")
             
             # Convert image to linear RGB array
-            rgb_data = self._blob_to_linear_rgb_array(input_path)
-            
-            # Prepare input tensor
-            input_tensor = ort.OrtValue.ortvalue_from_numpy(
-                rgb_data['data'].reshape(1, 3, rgb_data['height'], rgb_data['width']).astype(np.float32)
-            )
+            rgb, output_size = self._load_input(input_path)
             
-            # Run inference
-            logger.info("Running ONNX inference...")
-            feeds = {'input': input_tensor}
-            results = self.session.run(['output'], feeds)
-            
-            # Get output
-            output_data = results[0]  # greyscale data tensor
+            # Run inference (digabung dengan request lain jika dynamic batching aktif)
+            logger.info(f"Running ONNX inference at {rgb.shape[2]}x{rgb.shape[1]}...")
+            output_data = self.infer(rgb)
             logger.info(f"Inference completed. Output shape: {output_data.shape}")
             
-            # Convert output to image
-            dims = {
-                'width': output_data.shape[3],
-                'height': output_data.shape[2]
-            }
-            
-            line_art_img = self._linear_greyscale_array_to_image(
-                output_data.flatten(), dims
-            )
-            
-            # Save result
-            line_art_bgr = cv2.cvtColor(line_art_img, cv2.COLOR_RGB2BGR)
-            success = cv2.imwrite(output_path, line_art_bgr)
-            
-            if success:
-                logger.info(f"Line art saved to: {output_path}")
-                return True
-            else:
-                logger.error("Failed to save line art")
-                return False
+            return self._save_output(output_data, output_path, output_size)
                 
         except Exception as e:
             logger.error(f"Error in convert_to_line_art: {e}")
             return False
     
+    def convert_many(self, items, max_pending=16):
+        """Convert banyak gambar [(input_path, output_path), ...], return list True/False sesuai urutan
+
+        Input dikirim ke batcher tanpa menunggu hasil sebelumnya (maks max_pending gambar di memory),
+        sehingga gambar dalam satu request batch ikut digabung jadi batch tensor.
+        """
+        if self.session is None:
+            logger.error("ONNX model not loaded")
+            return [False] * len(items)
+        
+        results = [False] * len(items)
+        pending = deque()
+        
+        def finish(index, output_path, output_size, future):
+            try:
+                results[index] = self._save_output(self._result(future), output_path, output_size)
+            except Exception as e:
+                logger.error(f"Error in convert_many for {output_path}: {e}")
+        
+        for index, (input_path, output_path) in enumerate(items):
+            while len(pending) >= max_pending:
+                finish(*pending.popleft())
+            try:
+                rgb, output_size = self._load_input(input_path)
+                future = self._submit(rgb)
+            except Exception as e:
+                logger.error(f"Error in convert_many for {input_path}: {e}")
+                continue
+            pending.append((index, output_path, output_size, future))
+        
+        while pending:
+            finish(*pending.popleft())
+        return results
+    
     def is_model_ready(self):
         """Check if model is ready"""
-        return self.session is not None
\ No newline at end of file
+        return self.session is not None
+
+
+def get_line_art_processor(**options):
+    """LineArtProcessor bersama untuk seluruh proses - model dimuat sekali lalu tetap warm antar request
+
+    options (max_batch_size, batch_wait, batch_timeout, tile_size, tile_overlap, max_memory_mb, max_side, output_max_side,
+    session_options) dipakai saat processor dibuat.
+    Jika model gagal dimuat (mis. download gagal), request berikutnya mencoba memuat ulang.
+    """
+    global _processor
+    with _processor_lock:
+        if _processor is None or not _processor.is_model_ready():
+            _processor = LineArtProcessor(**options)
+        return _processor
+
+
+def end_line_art_profiling():
+    """Akhiri profiling processor bersama, return path file profile JSON (None jika belum dibuat/profiling mati)"""
+    with _processor_lock:
+        return _processor.end_profiling() if _processor is not None else None
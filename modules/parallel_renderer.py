@@ -0,0 +1,333 @@
+"""
+Parallel Renderer Module
+Render frame animasi di beberapa proses sekaligus (ProcessPoolExecutor)
+Frame dibagi per chunk [start, stop), parent mensimulasikan state canvas/mask kumulatif sekali untuk seluruh
+timeline dan mengirim snapshot state di awal tiap chunk; hasilnya dikembalikan ke encoder sesuai urutan
+lewat reorder buffer terbatas
+Mode segment: tiap proses merender + encode satu segment timeline (GOP utuh),
+lalu segment digabung tanpa re-encode
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import multiprocessing
+import tempfile
+import shutil
+import os
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# State per worker process (diisi sekali oleh initializer, bukan dikirim ulang tiap chunk)
+_worker_creator = None
+_worker_job = None
+
+
+class _TimelineState:
+    """State render incremental di satu frame global: canvas speed drawing, canvas akhir, mask + frame reveal
+
+    Dimajukan per frame dengan urutan yang sama seperti render berurutan (pixel-identical). Parent menjalankan
+    simulasi ini sekali untuk seluruh timeline dan mengambil snapshot di awal tiap chunk/segment; worker
+    melanjutkan dari snapshot itu sambil mengeluarkan frame.
+    """
+
+    def __init__(self, creator, job, snapshot=None):
+        self.creator = creator
+        self.job = job
+        snapshot = snapshot or {}
+        self.frame_index = snapshot.get('frame_index', 0)
+        self.canvas = snapshot.get('canvas')
+        self.drawn_points = snapshot.get('drawn_points', 0)
+        self.final_drawing_canvas = snapshot.get('final_drawing_canvas')
+        self.mask = snapshot.get('mask')
+        self.reveal_frame = snapshot.get('reveal_frame')
+        if self.canvas is None and self.final_drawing_canvas is None and self.mask is None:
+            self.canvas = np.full((job['height'], job['width'], 3), job['background_color_bgr'], dtype=np.uint8)
+
+        self.drawing_frames = job['drawing_frames']
+        self.reveal_start = self.drawing_frames + job['pause_frames']
+        self.reveal_end = self.reveal_start + job['reveal_frames']
+
+    def _finish_drawing(self):
+        """Canvas akhir speed drawing: lanjutkan canvas yang sama dengan sisa titik"""
+        if self.final_drawing_canvas is None:
+            self.creator.draw_pencil_range(self.job, self.canvas, self.drawn_points,
+                                           len(self.job['all_drawing_points']))
+            self.final_drawing_canvas, self.canvas = self.canvas, None
+
+    def next_run(self, stop):
+        """Frame di frame_index + jumlah frame identik berurutan sebelum stop (frame hold), lalu majukan state
+
+        Frame yang dikembalikan adalah buffer state (copy jika perlu disimpan setelah next_run berikutnya).
+        """
+        job, creator = self.job, self.creator
+        frame_index = self.frame_index
+        if frame_index < self.drawing_frames:
+            self.drawn_points = creator.advance_drawing_canvas(job, self.canvas, self.drawn_points, frame_index)
+            frame, count = self.canvas, 1
+        elif frame_index < self.reveal_start:
+            self._finish_drawing()
+            frame, count = self.final_drawing_canvas, min(stop, self.reveal_start) - frame_index
+        elif frame_index < self.reveal_end:
+            if self.mask is None:
+                self._finish_drawing()
+                self.mask = np.zeros((job['height'], job['width']), dtype=np.uint8)
+                self.reveal_frame = self.final_drawing_canvas.copy()
+            dirty_rect = creator.advance_reveal_mask(job, self.mask, frame_index - self.reveal_start)
+            frame, count = creator.composite_reveal_frame(job, self.mask, self.reveal_frame, dirty_rect), 1
+        else:
+            frame, count = job['color_img'], stop - frame_index
+        self.frame_index += count
+        return frame, count
+
+    def seek(self, frame_index):
+        """Majukan state sampai tepat sebelum frame_index (tanpa mengeluarkan frame)"""
+        while self.frame_index < frame_index:
+            self.next_run(frame_index)
+
+    def snapshot(self):
+        """Salinan bagian state yang dibutuhkan untuk melanjutkan render dari frame_index"""
+        snapshot = {'frame_index': self.frame_index}
+        if self.frame_index < self.drawing_frames:
+            snapshot.update(canvas=self.canvas.copy(), drawn_points=self.drawn_points)
+        elif self.frame_index < self.reveal_end:
+            if self.mask is None:
+                self._finish_drawing()
+                # Canvas akhir tidak diubah lagi setelah speed drawing selesai, tidak perlu di-copy
+                snapshot['final_drawing_canvas'] = self.final_drawing_canvas
+            else:
+                snapshot.update(mask=self.mask.copy(), reveal_frame=self.reveal_frame.copy())
+        return snapshot
+
+
+def _init_worker(job):
+    """Initializer worker: simpan data job yang dipakai semua chunk"""
+    global _worker_creator, _worker_job
+    from modules.animation_creator import AnimationCreator
+    _worker_creator = AnimationCreator()
+    _worker_job = job
+
+
+def _render_chunk(task):
+    """Render satu chunk frame di worker process, return array (frames, height, width, 3)"""
+    creator, job = _worker_creator, _worker_job
+    start, stop = task['start'], task['stop']
+    frames = np.empty((stop - start, job['height'], job['width'], 3), dtype=np.uint8)
+
+    if task['kind'] == 'timemap':
+        for i, frame_index in enumerate(range(start, stop)):
+            creator.render_frame(job, frame_index, frames[i])
+    elif task['kind'] == 'range':
+        # Lanjutkan dari snapshot state di awal chunk
+        state = _TimelineState(creator, job, task['state'])
+        while state.frame_index < stop:
+            index = state.frame_index - start
+            frame, count = state.next_run(stop)
+            frames[index:index + count] = frame
+    else:
+        raise ValueError(f"Unknown chunk kind: {task['kind']}")
+    return frames
+
+
+def _iter_range_runs(creator, job, task):
+    """Yield (frame, jumlah) untuk frame global [start, stop), dilanjutkan dari snapshot state awal segment"""
+    start, stop = task['start'], task['stop']
+    if task['kind'] == 'timemap':
+        out = np.empty((job['height'], job['width'], 3), dtype=np.uint8)
+        for frame_index in range(start, stop):
+            yield creator.render_frame(job, frame_index, out), 1
+        return
+
+    state = _TimelineState(creator, job, task['state'])
+    while state.frame_index < stop:
+        yield state.next_run(stop)
+
+
+def _create_pool(workers, job):
+    """Process pool dengan data job di initializer
+
+    Spawn, bukan fork: pool dibuat dari thread request/job render saat thread lain (batcher inference) aktif,
+    lock-nya bisa ikut tersalin dalam keadaan terkunci ke proses hasil fork.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(job,),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def _encode_segment(task):
+    """Render + encode satu segment di worker process, return (path, jumlah frame)"""
+    from modules.video_encoder import FFmpegFrameWriter, PipelinedFrameWriter
+    creator, job = _worker_creator, _worker_job
+    writer = FFmpegFrameWriter(task['path'], job['width'], job['height'], job['fps'], **task['encoder'])
+    if task['frame_queue_size']:
+        writer = PipelinedFrameWriter(writer, task['frame_queue_size'])
+    try:
+        for frame, count in _iter_range_runs(creator, job, task):
+            writer.write_repeated(frame, count)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return task['path'], writer.frames_written
+
+
+class ParallelSegmentEncoder:
+    """Bagi timeline video menjadi segment kelipatan GOP, render + encode tiap segment di proses terpisah,
+    lalu gabungkan dengan concat demuxer (-c copy)"""
+
+    def __init__(self, creator, job, encoder, workers=None, segment_frames=None, gop=None, renderer='incremental',
+                 frame_queue_size=0):
+        self.creator = creator
+        self.job = job
+        self.frame_queue_size = frame_queue_size
+        self.workers = workers or os.cpu_count() or 1
+        self.renderer = renderer
+        total_frames = creator.get_total_frames(job)
+        # GOP default 2 detik; panjang segment = kelipatan GOP, kira-kira 2 segment per worker
+        self.gop = gop or max(1, int(job['fps'] * 2))
+        if segment_frames is None:
+            segment_frames = -(-total_frames // (self.workers * 2))
+        self.segment_frames = max(1, -(-segment_frames // self.gop)) * self.gop
+
+        # Thread x264 dibagi rata antar encoder yang jalan bersamaan (kecuali di-set manual)
+        self.encoder = dict(encoder, gop=self.gop)
+        if self.encoder.get('threads') is None:
+            self.encoder['threads'] = max(1, (os.cpu_count() or 1) // self.workers)
+
+    def _iter_segments(self, temp_dir):
+        """Task per segment: range frame global + snapshot state di awal segment
+
+        State disimulasikan sekali (berurutan) di parent, worker hanya melanjutkan dari batas segment-nya.
+        """
+        total_frames = self.creator.get_total_frames(self.job)
+        state = None if self.renderer == 'timemap' else _TimelineState(self.creator, self.job)
+        for index, start in enumerate(range(0, total_frames, self.segment_frames)):
+            task = {
+                'kind': 'timemap' if state is None else 'range',
+                'start': start,
+                'stop': min(start + self.segment_frames, total_frames),
+                'path': os.path.join(temp_dir, f"segment_{index:05d}.mp4"),
+                'encoder': self.encoder,
+                'frame_queue_size': self.frame_queue_size,
+            }
+            if state is not None:
+                state.seek(start)
+                task['state'] = state.snapshot()
+            yield task
+
+    def encode(self, output_path, progress=None):
+        """Encode semua segment secara paralel lalu gabungkan ke output_path, return jumlah frame"""
+        from modules.video_encoder import concat_segments
+        temp_dir = tempfile.mkdtemp()
+        pool = _create_pool(self.workers, self.job)
+        try:
+            pending = deque()
+            segment_paths, frames_written = [], 0
+
+            def collect(future):
+                nonlocal frames_written
+                path, count = future.result()
+                segment_paths.append(path)
+                frames_written += count
+                if progress is not None:
+                    progress(len(segment_paths))
+
+            for task in self._iter_segments(temp_dir):
+                # Batasi jumlah segment (dan snapshot state) yang menunggu di memory
+                while len(pending) >= self.workers * 2:
+                    collect(pending.popleft())
+                pending.append(pool.submit(_encode_segment, task))
+            while pending:
+                collect(pending.popleft())
+
+            concat_segments(segment_paths, output_path)
+            logger.info(f"Encoded {frames_written} frames in {len(segment_paths)} segments to {output_path}")
+            return frames_written
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def num_segments(self):
+        """Jumlah segment untuk job ini"""
+        return -(-self.creator.get_total_frames(self.job) // self.segment_frames)
+
+
+class ParallelFrameRenderer:
+    """Render frame job di process pool dan yield (frame, jumlah ulang) sesuai urutan video"""
+
+    def __init__(self, creator, job, workers=None, chunk_size=8, max_pending=None, renderer='incremental'):
+        self.creator = creator
+        self.job = job
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        # Reorder buffer: maksimal chunk yang sedang dikerjakan / menunggu giliran
+        self.max_pending = max_pending or self.workers * 2
+        self.renderer = renderer
+
+    def _iter_chunks(self, kind, num_frames, offset=0):
+        """Bagi range frame menjadi chunk [start, stop)"""
+        for start in range(0, num_frames, self.chunk_size):
+            yield {'kind': kind, 'start': offset + start, 'stop': offset + min(start + self.chunk_size, num_frames)}
+
+    def _iter_items(self):
+        """Urutan item video: dict chunk (dirender di worker) atau (frame, jumlah) untuk frame hold"""
+        job = self.job
+        drawing_frames, pause_frames = job['drawing_frames'], job['pause_frames']
+        reveal_frames = job['reveal_frames']
+        full_mode = job['animation_mode'] == 'full'
+
+        if self.renderer == 'timemap':
+            # Time map tidak butuh state kumulatif, cukup range frame global
+            yield from self._iter_chunks('timemap', drawing_frames)
+            yield (job['final_drawing_canvas'], pause_frames)
+            if full_mode:
+                yield from self._iter_chunks('timemap', reveal_frames, offset=drawing_frames + pause_frames)
+                yield (job['color_img'], job['fps'])
+            return
+
+        # Simulasi state kumulatif sekali di parent, tiap chunk membawa snapshot state di frame pertamanya
+        state = _TimelineState(self.creator, job)
+        for chunk in self._iter_chunks('range', drawing_frames):
+            state.seek(chunk['start'])
+            chunk['state'] = state.snapshot()
+            yield chunk
+
+        state.seek(drawing_frames)
+        if pause_frames:
+            yield state.next_run(drawing_frames + pause_frames)
+
+        if full_mode:
+            for chunk in self._iter_chunks('range', reveal_frames, offset=drawing_frames + pause_frames):
+                state.seek(chunk['start'])
+                chunk['state'] = state.snapshot()
+                yield chunk
+            yield (job['color_img'], job['fps'])
+
+    def iter_frame_runs(self):
+        """Yield (frame, jumlah) sesuai urutan video; frame hold tidak diulang di sini"""
+        pending = deque()
+        pool = _create_pool(self.workers, self.job)
+        try:
+            for item in self._iter_items():
+                while len(pending) >= self.max_pending:
+                    yield from self._drain(pending.popleft())
+                pending.append(pool.submit(_render_chunk, item) if isinstance(item, dict) else item)
+            while pending:
+                yield from self._drain(pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _drain(self, entry):
+        """Yield frame dari item paling depan (tunggu worker jika belum selesai)"""
+        if isinstance(entry, tuple):
+            yield entry
+        else:
+            for frame in entry.result():
+                yield frame, 1
@@ -0,0 +1,232 @@
+"""
+Render Cache Module
+Cache hasil render MP4 berdasarkan isi input (hash gambar + line art + parameter)
+dan cache skeleton/jalur gambar per line art (.npz)
+Render ulang dengan input dan setting yang sama langsung memakai file dari cache
+Ukuran cache dibatasi, file yang paling lama tidak dipakai dihapus duluan (LRU)
+"""
+
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Versi format key - naikkan jika cara render berubah supaya entry lama tidak dipakai
+CACHE_KEY_VERSION = 2
+# Versi preprocessing line art (load_and_preprocess/skeletonize/extract_drawing_path)
+PATH_CACHE_VERSION = 1
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 dari isi file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize_number(value):
+    """8, 8.0 dan "8" menghasilkan key yang sama"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _normalize_color(value):
+    """'#FF0000' dan 'ff0000' menghasilkan key yang sama"""
+    return value.lstrip('#').lower() if value else None
+
+
+def normalize_render_params(params):
+    """Parameter render yang mempengaruhi hasil video dalam bentuk kanonik"""
+    return {
+        'style_choice': int(params['style_choice']),
+        'drawing_duration': _normalize_number(params['drawing_duration']),
+        'reveal_duration': _normalize_number(params['reveal_duration']),
+        'fps': _normalize_number(params['fps']),
+        'reveal_area_multiplier': _normalize_number(params.get('reveal_area_multiplier', 1.0)),
+        'animation_mode': params.get('animation_mode', 'full'),
+        'line_color': _normalize_color(params.get('line_color')),
+        'background_color': _normalize_color(params.get('background_color')),
+        'line_renderer': params.get('line_renderer', 'circles'),
+        'renderer': params.get('renderer', 'incremental'),
+        'seed': int(params['seed']) if params.get('seed') is not None else None,
+        'preview': bool(params.get('preview', False)),
+        'encoder': params.get('encoder'),
+        'encode_mode': params.get('encode_mode', 'single'),
+    }
+
+
+class DiskCache:
+    """Folder cache di disk dengan batas ukuran, entry paling lama tidak dipakai dihapus duluan (LRU)"""
+
+    suffix = ''
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def _touch(self, entry_path):
+        """Tandai entry baru dipakai untuk urutan LRU"""
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+    def _write_atomic(self, destination, write):
+        """Tulis lewat file temporary + rename supaya pembaca tidak pernah melihat file setengah jadi
+
+        write(file_obj) mengisi file temporary.
+        """
+        directory = os.path.dirname(os.path.abspath(destination))
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temp_path, destination)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _copy_atomic(self, source, destination):
+        """Copy file secara atomic"""
+        def write(f):
+            with open(source, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        self._write_atomic(destination, write)
+
+    def _entries(self):
+        """List (mtime, size, path) semua entry cache"""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Hapus entry paling lama tidak dipakai sampai total ukuran <= max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info(f"Cache evicted: {os.path.basename(path)}")
+            except OSError:
+                pass
+
+    def stats(self):
+        """Jumlah entry dan total ukuran cache"""
+        entries = self._entries()
+        return {'entries': len(entries), 'total_bytes': sum(size for _, size, _ in entries), 'max_bytes': self.max_bytes}
+
+
+class RenderCache(DiskCache):
+    """Cache MP4 di disk, key = hash isi gambar asli + line art + parameter render"""
+
+    suffix = '.mp4'
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    def make_key(self, color_image_path, line_art_path, params):
+        """Hitung key cache dari isi file input dan parameter render"""
+        key_data = {
+            'version': CACHE_KEY_VERSION,
+            'color_image': hash_file(color_image_path),
+            'line_art': hash_file(line_art_path),
+            'params': normalize_render_params(params),
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def fetch(self, key, output_path):
+        """Copy video dari cache ke output_path, return True jika ada (cache hit)"""
+        entry_path = self._entry_path(key)
+        try:
+            self._copy_atomic(entry_path, output_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Render cache read failed for {key}: {e}")
+            return False
+        self._touch(entry_path)
+        logger.info(f"Render cache hit: {key}")
+        return True
+
+    def store(self, key, video_path):
+        """Simpan video hasil render ke cache lalu jalankan eviction"""
+        try:
+            self._copy_atomic(video_path, self._entry_path(key))
+            logger.info(f"Render cache stored: {key}")
+            self.evict()
+        except OSError as e:
+            logger.warning(f"Render cache write failed for {key}: {e}")
+
+
+class PathCache(DiskCache):
+    """Cache hasil preprocess line art (binary, skeleton, kontur terurut) per hash isi line art (.npz)"""
+
+    suffix = '.npz'
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    def make_key(self, line_art_path):
+        """Key = hash isi file line art + versi preprocessing"""
+        return f"v{PATH_CACHE_VERSION}_{hash_file(line_art_path)}"
+
+    def load(self, key):
+        """Return dict {'binary', 'skeleton', 'paths'} atau None jika belum ada"""
+        entry_path = self._entry_path(key)
+        try:
+            with np.load(entry_path) as data:
+                binary, skeleton = data['binary'], data['skeleton']
+                points, path_lengths = data['points'], data['path_lengths']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Path cache read failed for {key}: {e}")
+            return None
+        self._touch(entry_path)
+        paths = np.split(points, np.cumsum(path_lengths)[:-1]) if len(path_lengths) else []
+        logger.info(f"Path cache hit: {key}")
+        return {'binary': binary, 'skeleton': skeleton, 'paths': paths}
+
+    def store(self, key, binary, skeleton, paths):
+        """Simpan binary, skeleton dan kontur (digabung jadi satu array titik + panjang tiap kontur)"""
+        path_lengths = np.array([len(path) for path in paths], dtype=np.int64)
+        points = np.concatenate(paths) if paths else np.empty((0, 2), dtype=np.int32)
+        try:
+            self._write_atomic(self._entry_path(key), lambda f: np.savez_compressed(
+                f, binary=binary, skeleton=skeleton, points=points, path_lengths=path_lengths))
+            logger.info(f"Path cache stored: {key}")
+            self.evict()
+        except OSError as e:
+            logger.warning(f"Path cache write failed for {key}: {e}")
@@ -0,0 +1,178 @@
+"""
+Render Jobs Module
+Antrian job render di background untuk server Flask
+Request langsung dapat job id, job dijalankan oleh pool worker terbatas,
+status/progress (fase, frame, ETA) bisa di-poll atau di-stream lewat SSE
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import time
+import uuid
+import logging
+import traceback
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Status job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+def _estimate_eta(anchor, now, current, total):
+    """Sisa detik dari kecepatan sejak anchor (waktu, current), None jika belum bisa dihitung"""
+    started, start_count = anchor
+    if total and current >= total:
+        return 0.0
+    if current <= start_count:
+        return None
+    return round((now - started) / (current - start_count) * (total - current), 1)
+
+
+class RenderJobManager:
+    """Jalankan job render di thread pool terbatas dan simpan status tiap job di memory"""
+
+    def __init__(self, max_workers=2, max_finished_jobs=500):
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='render-job')
+        self._jobs = OrderedDict()
+        self._condition = threading.Condition()
+
+    def submit(self, fn, *args, **kwargs):
+        """Masukkan job ke antrian, return job id
+
+        fn dipanggil sebagai fn(progress_callback, *args, **kwargs) dan return dict hasil job.
+        """
+        job_id = str(uuid.uuid4())
+        job = {
+            'job_id': job_id,
+            'status': JOB_QUEUED,
+            'phase': None,
+            'message': 'Menunggu giliran render...',
+            'current': 0,
+            'total': 0,
+            'percentage': 0.0,
+            'eta_seconds': None,
+            'phase_eta_seconds': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'items': [],
+            'result': None,
+            'error': None,
+            'version': 0,
+        }
+        with self._condition:
+            self._jobs[job_id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        logger.info(f"Render job {job_id} queued")
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        """Eksekusi job di worker thread"""
+        self._update(job_id, status=JOB_RUNNING, started_at=time.time(), message='Render dimulai...')
+        phase_started = {}
+        job_started = {}
+        items = []
+
+        def progress_callback(event):
+            """Terima event dari AnimationCreator: {'phase', 'current', 'total'} atau {'message'}
+
+            Event fase boleh membawa 'frame' + 'total_frames' (posisi di seluruh video) supaya eta_seconds
+            menghitung sisa waktu semua fase, bukan hanya fase yang sedang jalan (phase_eta_seconds).
+            Job batch juga mengirim {'item': hasil satu item} yang dikumpulkan di 'items' status job.
+            """
+            fields = {}
+            if 'item' in event:
+                items.append(event['item'])
+                fields['items'] = list(items)
+            if 'message' in event:
+                fields['message'] = event['message']
+            if 'phase' in event:
+                phase, current, total = event['phase'], event['current'], event['total']
+                # Renderer tanpa 'frame' (time map, parallel, segment, batch) sudah menghitung seluruh job
+                done, job_total = event.get('frame', current), event.get('total_frames', total)
+                now = time.time()
+                phase_eta = _estimate_eta(phase_started.setdefault(phase, (now, current)), now, current, total)
+                eta = _estimate_eta(job_started.setdefault('anchor', (now, done)), now, done, job_total)
+                fields.update(phase=phase, current=current, total=total,
+                              percentage=round(current / total * 100, 1) if total else 0.0,
+                              eta_seconds=eta, phase_eta_seconds=phase_eta)
+            if fields:
+                self._update(job_id, **fields)
+
+        try:
+            result = fn(progress_callback, *args, **kwargs)
+            self._update(job_id, status=JOB_DONE, result=result, eta_seconds=0.0, phase_eta_seconds=0.0,
+                         message='Render selesai', finished_at=time.time())
+            logger.info(f"Render job {job_id} done")
+        except Exception as e:
+            logger.error(f"Render job {job_id} failed: {e}")
+            logger.error(traceback.format_exc())
+            self._update(job_id, status=JOB_FAILED, error=str(e), eta_seconds=None, phase_eta_seconds=None,
+                         message='Render gagal', finished_at=time.time())
+
+    def _update(self, job_id, **fields):
+        """Update status job dan bangunkan semua listener SSE"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['version'] += 1
+            self._condition.notify_all()
+
+    def _evict_finished(self):
+        """Buang job selesai paling lama jika jumlahnya melebihi batas (dipanggil dengan lock)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Snapshot status job (dict copy), atau None jika job tidak ada"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def queue_position(self, job_id):
+        """Jumlah job queued di depan job ini (0 = berikutnya dijalankan)"""
+        with self._condition:
+            queued = [jid for jid, job in self._jobs.items() if job['status'] == JOB_QUEUED]
+            return queued.index(job_id) if job_id in queued else None
+
+    def wait_for_update(self, job_id, version, timeout=15.0):
+        """Tunggu sampai version job berubah (atau timeout), return snapshot terbaru atau None"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]['version'] != version,
+                timeout=timeout
+            )
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def iter_events(self, job_id, heartbeat=15.0):
+        """Generator snapshot job untuk SSE: yield tiap ada perubahan, None sebagai heartbeat"""
+        job = self.get(job_id)
+        version = None
+        while job is not None:
+            if job['version'] != version:
+                yield job
+                version = job['version']
+                if job['status'] in FINISHED_STATES:
+                    return
+            else:
+                yield None
+            job = self.wait_for_update(job_id, version, timeout=heartbeat)
@@ -0,0 +1,379 @@
+"""
+Video Encoder Module
+Menulis frame animasi ke file MP4 (H.264)
+Mode streaming: frame mentah dikirim langsung ke ffmpeg lewat pipe
+Mode files: frame disimpan sebagai PNG lalu di-encode oleh moviepy (cara lama)
+PipelinedFrameWriter menjalankan writer di thread sendiri, render dan encode jalan bersamaan
+"""
+
+import cv2
+import numpy as np
+import re
+from moviepy.config import get_setting
+import subprocess
+import threading
+import tempfile
+import queue
+import os
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+X264_PRESETS = ('ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow')
+X264_TUNES = ('film', 'animation', 'grain', 'stillimage', 'fastdecode', 'zerolatency')
+
+# Setting encoder default per mode. 'standard' = default moviepy/x264 (preset medium, CRF 23)
+ENCODER_PROFILES = {
+    'preview': {'preset': 'ultrafast', 'crf': 28, 'tune': 'animation'},
+    'standard': {'preset': 'medium'},
+    'archive': {'preset': 'slow', 'crf': 18, 'tune': 'animation'},
+}
+ENCODER_SETTING_KEYS = ('preset', 'crf', 'bitrate', 'threads', 'tune')
+# Bitrate ffmpeg: angka bulat dengan satu suffix k/M opsional (mis. 5000k, 8M)
+BITRATE_PATTERN = re.compile(r'\d+[kKmM]?')
+
+
+def resolve_encoder_settings(profile='standard', overrides=None):
+    """Gabungkan profile encoder dengan override, validasi, return dict preset/crf/bitrate/threads/tune"""
+    if profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile: {profile}")
+    settings = dict.fromkeys(ENCODER_SETTING_KEYS)
+    settings.update(ENCODER_PROFILES[profile])
+    for key, value in (overrides or {}).items():
+        if key not in ENCODER_SETTING_KEYS:
+            raise ValueError(f"Unknown encoder setting: {key}")
+        settings[key] = value
+
+    if settings['preset'] not in X264_PRESETS:
+        raise ValueError(f"Invalid preset: {settings['preset']}")
+    if settings['tune'] is not None and settings['tune'] not in X264_TUNES:
+        raise ValueError(f"Invalid tune: {settings['tune']}")
+    if settings['crf'] is not None:
+        settings['crf'] = int(settings['crf'])
+        if not 0 <= settings['crf'] <= 51:
+            raise ValueError(f"CRF must be between 0 and 51: {settings['crf']}")
+    if settings['threads'] is not None:
+        settings['threads'] = int(settings['threads'])
+        if settings['threads'] < 0:
+            raise ValueError(f"Threads must be >= 0: {settings['threads']}")
+    if settings['bitrate'] is not None:
+        settings['bitrate'] = str(settings['bitrate'])
+        if not BITRATE_PATTERN.fullmatch(settings['bitrate']):
+            raise ValueError(f"Invalid bitrate: {settings['bitrate']}")
+    return settings
+
+
+def x264_output_args(crf=None, bitrate=None, threads=None, tune=None):
+    """Argumen ffmpeg tambahan untuk rate control, tune dan jumlah thread (bitrate mengalahkan CRF)"""
+    args = []
+    if bitrate is not None:
+        args.extend(['-b:v', bitrate])
+    elif crf is not None:
+        args.extend(['-crf', str(crf)])
+    if tune is not None:
+        args.extend(['-tune', tune])
+    if threads is not None:
+        args.extend(['-threads', str(threads)])
+    return args
+
+
+class FFmpegFrameWriter:
+    """Kirim frame BGR dari memory ke satu proses ffmpeg/libx264 yang hidup selama render"""
+
+    def __init__(self, output_path, width, height, fps, codec="libx264", preset="medium", crf=None, bitrate=None,
+                 threads=None, tune=None, gop=None):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.bitrate = bitrate
+        self.threads = threads
+        self.tune = tune
+        # Jarak keyframe tetap (dipakai encoding per segment supaya segment berisi GOP utuh)
+        self.gop = gop
+        self.frames_written = 0
+        self._proc = None
+        # Buffer RGB yang dipakai ulang tiap frame (input rgb24 sama seperti moviepy,
+        # konversi swscale dari bgr24 kurang akurat)
+        self._rgb_buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self._open()
+
+    def _build_command(self):
+        """Susun command ffmpeg - sama dengan default moviepy (input rgb24 dari stdin)"""
+        cmd = [
+            get_setting("FFMPEG_BINARY"),
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-vcodec', 'rawvideo',
+            '-s', '%dx%d' % (self.width, self.height),
+            '-pix_fmt', 'rgb24',
+            '-r', '%.02f' % self.fps,
+            '-an', '-i', '-',
+            '-vcodec', self.codec,
+            '-preset', self.preset,
+        ]
+        cmd.extend(x264_output_args(self.crf, self.bitrate, self.threads, self.tune))
+        if self.gop:
+            cmd.extend(['-g', str(self.gop), '-keyint_min', str(self.gop), '-sc_threshold', '0'])
+        if self.codec == 'libx264' and self.width % 2 == 0 and self.height % 2 == 0:
+            cmd.extend(['-pix_fmt', 'yuv420p'])
+        cmd.append(self.output_path)
+        return cmd
+
+    def _open(self):
+        """Start proses ffmpeg"""
+        popen_params = {
+            "stdout": subprocess.DEVNULL,
+            "stderr": subprocess.PIPE,
+            "stdin": subprocess.PIPE
+        }
+        # Jangan buka jendela console tambahan di Windows
+        if os.name == "nt":
+            popen_params["creationflags"] = 0x08000000  # CREATE_NO_WINDOW
+
+        self._proc = subprocess.Popen(self._build_command(), **popen_params)
+
+    def _raise_ffmpeg_error(self, error):
+        """Ambil pesan error dari ffmpeg dan lempar sebagai IOError"""
+        self._proc.stdin.close()
+        ffmpeg_error = self._proc.stderr.read().decode(errors="replace").strip()
+        self._proc.wait()
+        raise IOError(f"ffmpeg gagal menulis {self.output_path}: {ffmpeg_error or error}")
+
+    def write_frame(self, frame):
+        """Tulis satu frame BGR (height, width, 3) uint8"""
+        if frame.shape != (self.height, self.width, 3):
+            raise ValueError(f"Frame shape {frame.shape} tidak sesuai dengan {(self.height, self.width, 3)}")
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        self._write_rgb_buffer()
+
+    def write_repeated(self, frame, count):
+        """Tulis frame yang sama count kali (hold) - konversi warna hanya sekali, sisanya copy bytes"""
+        if count <= 0:
+            return
+        self.write_frame(frame)
+        for _ in range(count - 1):
+            self._write_rgb_buffer()
+
+    def _write_rgb_buffer(self):
+        """Kirim isi buffer RGB ke stdin ffmpeg"""
+        try:
+            self._proc.stdin.write(self._rgb_buffer.data)
+        except (BrokenPipeError, OSError) as e:
+            self._raise_ffmpeg_error(e)
+        self.frames_written += 1
+
+    def close(self):
+        """Tutup pipe dan tunggu ffmpeg selesai encoding"""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        proc.stdin.close()
+        ffmpeg_error = proc.stderr.read().decode(errors="replace").strip()
+        if proc.wait() != 0:
+            raise IOError(f"ffmpeg gagal membuat {self.output_path}: {ffmpeg_error}")
+        logger.info(f"Encoded {self.frames_written} frames to {self.output_path}")
+
+    def abort(self):
+        """Hentikan ffmpeg tanpa menyelesaikan file (dipakai saat render error)"""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        proc.kill()
+        proc.wait()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+
+class PipelinedFrameWriter:
+    """Jalankan writer (FFmpegFrameWriter/PngSequenceWriter) di thread consumer terpisah
+
+    Thread render menyalin frame ke salah satu dari queue_size buffer yang dipakai ulang lalu langsung
+    lanjut render frame berikutnya; konversi warna + tulis ke pipe/PNG dikerjakan thread consumer.
+    Jika semua buffer sedang dipakai, render menunggu (memory tetap queue_size frame berapapun panjang video).
+    """
+
+    def __init__(self, writer, queue_size=8):
+        self.writer = writer
+        self.queue_size = max(1, queue_size)
+        self.frames_written = 0
+        self._free_buffers = queue.Queue()
+        self._buffer_shape = None
+        self._frames = queue.Queue(maxsize=self.queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._consume, name='frame-writer', daemon=True)
+        self._thread.start()
+
+    def _consume(self):
+        """Loop consumer: tulis frame dari queue ke writer, kembalikan buffer ke pool"""
+        while True:
+            item = self._frames.get()
+            if item is None:
+                return
+            buffer, count = item
+            try:
+                if self._error is None:
+                    self.writer.write_repeated(buffer, count)
+            except BaseException as e:
+                # Tetap kosongkan queue supaya thread render tidak menunggu buffer selamanya
+                self._error = e
+            finally:
+                self._free_buffers.put(buffer)
+
+    def _acquire_buffer(self, frame):
+        """Ambil buffer kosong (alokasi hanya sampai queue_size buffer), tunggu jika semua dipakai"""
+        if self._buffer_shape is None:
+            self._buffer_shape = (frame.shape, frame.dtype)
+            for _ in range(self.queue_size):
+                self._free_buffers.put(np.empty(frame.shape, dtype=frame.dtype))
+        elif (frame.shape, frame.dtype) != self._buffer_shape:
+            raise ValueError(f"Frame shape {frame.shape} tidak sesuai dengan {self._buffer_shape[0]}")
+        return self._free_buffers.get()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def write_frame(self, frame):
+        """Salin frame ke buffer pool lalu antrikan ke consumer"""
+        self.write_repeated(frame, 1)
+
+    def write_repeated(self, frame, count):
+        """Antrikan frame hold sebagai satu item (count kali ditulis oleh consumer)"""
+        if count <= 0:
+            return
+        self._raise_if_failed()
+        buffer = self._acquire_buffer(frame)
+        np.copyto(buffer, frame)
+        self._frames.put((buffer, count))
+        self.frames_written += count
+
+    def _stop(self):
+        """Kirim sentinel dan tunggu consumer selesai menulis semua frame di queue"""
+        if self._thread.is_alive():
+            self._frames.put(None)
+            self._thread.join()
+
+    def close(self):
+        """Tunggu semua frame ditulis lalu close writer"""
+        self._stop()
+        if self._error is not None:
+            self.writer.abort()
+            raise self._error
+        self.writer.close()
+
+    def abort(self):
+        """Buang frame yang belum ditulis dan abort writer"""
+        if self._error is None:
+            self._error = IOError("Render dibatalkan")
+        self._stop()
+        self.writer.abort()
+
+
+def concat_segments(segment_paths, output_path):
+    """Gabungkan segment MP4 (encoder setting sama) tanpa re-encode lewat ffmpeg concat demuxer"""
+    list_fd, list_path = tempfile.mkstemp(suffix='.txt')
+    try:
+        with os.fdopen(list_fd, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        cmd = [
+            get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-c', 'copy', output_path
+        ]
+        popen_params = {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE, "stdin": subprocess.DEVNULL}
+        if os.name == "nt":
+            popen_params["creationflags"] = 0x08000000  # CREATE_NO_WINDOW
+        proc = subprocess.Popen(cmd, **popen_params)
+        _, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise IOError(f"ffmpeg gagal menggabungkan segment ke {output_path}: "
+                          f"{stderr.decode(errors='replace').strip()}")
+        logger.info(f"Concatenated {len(segment_paths)} segments to {output_path}")
+    finally:
+        os.remove(list_path)
+
+
+class PngSequenceWriter:
+    """Simpan frame sebagai PNG di folder temporary lalu encode dengan moviepy saat close"""
+
+    def __init__(self, output_path, fps, codec="libx264", preset="medium", crf=None, bitrate=None, threads=None,
+                 tune=None):
+        self.output_path = output_path
+        self.fps = fps
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.bitrate = bitrate
+        self.threads = threads
+        self.tune = tune
+        self.temp_dir = tempfile.mkdtemp()
+        self.frame_paths = []
+        self.frames_written = 0
+
+    def write_frame(self, frame):
+        """Tulis satu frame BGR sebagai PNG"""
+        frame_path = os.path.join(self.temp_dir, f"frame_{self.frames_written:05d}.png")
+        cv2.imwrite(frame_path, frame)
+        self.frame_paths.append(frame_path)
+        self.frames_written += 1
+
+    def write_repeated(self, frame, count):
+        """Simpan frame hold sekali sebagai PNG, lalu pakai path yang sama count kali"""
+        if count <= 0:
+            return
+        self.write_frame(frame)
+        self.frame_paths.extend([self.frame_paths[-1]] * (count - 1))
+        self.frames_written += count - 1
+
+    def close(self):
+        """Encode semua PNG ke MP4 lalu bersihkan file temporary"""
+        # Import di sini: moviepy.editor berat dan tidak dipakai mode streaming / worker render
+        from moviepy.editor import ImageSequenceClip
+        try:
+            logger.info("Creating ImageSequenceClip...")
+            clip = ImageSequenceClip(self.frame_paths, fps=self.fps)
+            logger.info(f"Clip duration: {clip.duration} seconds")
+            logger.info("Starting video encoding...")
+            clip.write_videofile(self.output_path, codec=self.codec, preset=self.preset, bitrate=self.bitrate,
+                                 threads=self.threads, ffmpeg_params=x264_output_args(None if self.bitrate else self.crf, tune=self.tune),
+                                 verbose=False, logger=None)
+        finally:
+            self._cleanup()
+
+    def abort(self):
+        """Bersihkan file temporary tanpa encoding"""
+        self._cleanup()
+
+    def _cleanup(self):
+        """Hapus frame PNG dan folder temporary"""
+        logger.info("Cleaning up temporary files...")
+        for path in dict.fromkeys(self.frame_paths):
+            try:
+                os.remove(path)
+            except OSError:
+                logger.warning(f"Failed to remove temp file: {path}")
+        self.frame_paths = []
+        try:
+            os.rmdir(self.temp_dir)
+        except OSError:
+            logger.warning(f"Failed to remove temp directory: {self.temp_dir}")
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, render_template, request, jsonify, send_file, url_for, Response
 import os
 import uuid
 from werkzeug.utils import secure_filename
@@ -9,12 +9,16 @@ import traceback
 import sys
 import zipfile
 import io
+from modules.render_jobs import RenderJobManager
+from modules.batch_renderer import BatchRenderer
+from modules.render_cache import RenderCache, PathCache
 
 # --- TAMBAHAN: Impor untuk GUI Launcher ---
 import tkinter as tk
 from tkinter import ttk
 import webbrowser
 import threading
+import multiprocessing
 # -----------------------------------------
 
 # Setup logging
@@ -29,17 +33,114 @@ app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['RENDER_WORKERS'] = 1  # Jumlah proses untuk render frame (>1 = parallel render, None = semua core)
+app.config['ENCODE_MODE'] = 'single'  # 'segments' = render + encode segment GOP di RENDER_WORKERS proses lalu concat
+app.config['RENDER_JOB_WORKERS'] = 2  # Jumlah job render async yang dijalankan bersamaan
+app.config['BATCH_MAX_CONCURRENCY'] = None  # Jumlah file /process_batch yang dirender bersamaan (None = semua core)
+app.config['RENDER_CACHE_FOLDER'] = 'cache/renders'
+app.config['RENDER_CACHE_MAX_BYTES'] = 2 * 1024 * 1024 * 1024  # 2GB, entry paling lama tidak dipakai dihapus duluan
+app.config['PATH_CACHE_FOLDER'] = 'cache/paths'
+app.config['PATH_CACHE_MAX_BYTES'] = 512 * 1024 * 1024  # Skeleton + jalur gambar per line art (.npz)
+app.config['ENCODER_PROFILE'] = 'standard'  # Profile encoder render final: 'standard' atau 'archive' (preview selalu 'preview')
+app.config['ENCODER_SETTINGS'] = {}  # Override server untuk preset/crf/bitrate/threads/tune, mis. {'threads': 4}
+app.config['LINE_ART_BATCH_SIZE'] = 8  # Maks gambar per batch inference line art (1 = tanpa dynamic batching)
+app.config['LINE_ART_BATCH_WAIT'] = 0.01  # Detik menunggu request lain sebelum batch dijalankan
+app.config['LINE_ART_BATCH_TIMEOUT'] = 300  # Detik maksimal menunggu hasil inference satu gambar
+app.config['LINE_ART_TILE_SIZE'] = 1024  # Sisi tile (px) untuk gambar besar
+app.config['LINE_ART_TILE_OVERLAP'] = 128  # Overlap antar tile (px), di-blend supaya tidak ada sambungan
+# Batas memory aktivasi per inference, gambar lebih besar diproses per tile.
+# 4096 MB (~4.2 MP) cukup untuk gambar yang sudah dinormalisasi ke LINE_ART_INFERENCE_MAX_SIDE (1920x1920 = 3.7 MP),
+# jadi foto HP 4:3 (1920x1440) diproses dalam satu pass tanpa tile
+app.config['LINE_ART_MAX_MEMORY_MB'] = 4096
+app.config['LINE_ART_INFERENCE_MAX_SIDE'] = 1920  # Gambar diperkecil ke sisi ini sebelum inference (None = resolusi upload)
+app.config['LINE_ART_OUTPUT_MAX_SIDE'] = None  # Sisi terpanjang line art yang disimpan (None = ukuran gambar asli)
+# Setting onnxruntime, mis. {'intra_op_threads': 4, 'allow_spinning': False, 'optimized_model_path': 'models/model.optimized.onnx'}
+app.config['LINE_ART_SESSION_OPTIONS'] = {}
+app.config['LINE_ART_PROFILING'] = False  # Diagnostik: profile onnxruntime, ambil file lewat POST /api/line_art_profile
 
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 os.makedirs('static/temp', exist_ok=True)
 
+# Antrian job render async (request "async": true langsung dapat job id)
+render_jobs = RenderJobManager(max_workers=app.config['RENDER_JOB_WORKERS'])
+# Process pool untuk /process_batch (satu file per proses)
+batch_renderer = BatchRenderer(max_concurrency=app.config['BATCH_MAX_CONCURRENCY'])
+# Cache MP4 berdasarkan isi gambar + line art + setting render
+render_cache = RenderCache(app.config['RENDER_CACHE_FOLDER'], max_bytes=app.config['RENDER_CACHE_MAX_BYTES'])
+# Cache skeleton + jalur gambar per isi line art (dipakai ulang walau style/fps/warna berubah)
+path_cache = PathCache(app.config['PATH_CACHE_FOLDER'], max_bytes=app.config['PATH_CACHE_MAX_BYTES'])
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def run_animation_job(progress_callback, animation_url, animation_filename, **render_kwargs):
+    """Jalankan create_combined_animation di worker job render (dipanggil oleh RenderJobManager)"""
+    from modules.animation_creator import AnimationCreator
+    creator = AnimationCreator()
+    creator.progress_callback = progress_callback
+    if not creator.create_combined_animation(**render_kwargs):
+        raise RuntimeError('Animation creation failed')
+    return {
+        'animation_url': animation_url,
+        'animation_filename': animation_filename
+    }
+
+def run_batch_job(progress_callback, results, pending, file_ids, animation_files, download_urls):
+    """Render batch di process pool BatchRenderer dari worker job render, progress dilaporkan per item"""
+    results = list(results)
+    progress_callback({'phase': 'Batch Render', 'current': 0, 'total': len(pending)})
+    for done, (index, success, error) in enumerate(batch_renderer.iter_results(pending), 1):
+        if success:
+            result = {
+                'file_id': file_ids[index],
+                'success': True,
+                'animation_url': download_urls[index],
+                'animation_filename': animation_files[index]
+            }
+        else:
+            result = {'file_id': file_ids[index], 'success': False, 'error': error}
+        results.append(result)
+        progress_callback({'item': result, 'message': f"{file_ids[index]}: {'selesai' if success else 'gagal'}",
+                           'phase': 'Batch Render', 'current': done, 'total': len(pending)})
+    
+    # Hasil dikembalikan sesuai urutan file_ids
+    results.sort(key=lambda r: file_ids.index(r['file_id']))
+    return {
+        'results': results,
+        'total': len(file_ids),
+        'successful': len([r for r in results if r['success']]),
+        'failed': len([r for r in results if not r['success']])
+    }
+
+def parse_seed(value):
+    """Seed render dari request: None (random) atau integer >= 0"""
+    if value is None or value == '':
+        return None
+    seed = int(value)
+    if seed < 0:
+        raise ValueError('Seed must be a non-negative integer')
+    return seed
+
+def parse_encoder_options(options, preview=False):
+    """Profile + setting encoder dari request digabung dengan config server (ValueError jika tidak valid)"""
+    from modules.video_encoder import resolve_encoder_settings
+    profile = options.get('encoder_profile') or ('preview' if preview else app.config['ENCODER_PROFILE'])
+    settings = {**app.config['ENCODER_SETTINGS'], **(options.get('encoder_settings') or {})}
+    resolve_encoder_settings(profile, settings)
+    return profile, settings
+
+def job_urls(job_id):
+    """URL status dan SSE untuk satu job"""
+    return {
+        'job_id': job_id,
+        'status_url': url_for('get_job', job_id=job_id),
+        'events_url': url_for('job_events', job_id=job_id)
+    }
+
 # ==================================================================
 # SEMUA FUNGSI DAN ROUTE FLASK ANDA TETAP SAMA (TIDAK DIUBAH)
 # ==================================================================
@@ -131,13 +232,25 @@ def process_batch():
         data = request.get_json()
         file_ids = data.get('file_ids', [])
         settings = data.get('settings', {})
+        run_async = data.get('async', False)
         
         if not file_ids:
             return jsonify({'error': 'No file IDs provided'}), 400
         
+        try:
+            seed = parse_seed(settings.get('seed'))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Seed must be a non-negative integer'}), 400
+        
+        try:
+            encoder_profile, encoder_settings = parse_encoder_options(settings)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid encoder settings: {e}'}), 400
+        
         results = []
+        pending = []  # (index, render_kwargs) untuk dirender di batch pool
         
-        for file_id in file_ids:
+        for index, file_id in enumerate(file_ids):
             try:
                 # Find files
                 original_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) 
@@ -156,14 +269,9 @@ def process_batch():
                 original_path = os.path.join(app.config['UPLOAD_FOLDER'], original_files[0])
                 line_art_path = os.path.join(app.config['OUTPUT_FOLDER'], line_art_files[0])
                 
-                # Create animation
-                from modules.animation_creator import AnimationCreator
-                creator = AnimationCreator()
-                
                 animation_filename = f"{file_id}_animation.mp4"
                 animation_path = os.path.join(app.config['OUTPUT_FOLDER'], animation_filename)
-                
-                success = creator.create_combined_animation(
+                render_kwargs = dict(
                     line_art_path=line_art_path,
                     color_image_path=original_path,
                     output_path=animation_path,
@@ -171,22 +279,18 @@ def process_batch():
                     drawing_duration=settings.get('drawing_duration', 8),
                     reveal_duration=settings.get('reveal_duration', 10),
                     fps=settings.get('fps', 30),
-                    reveal_area_multiplier=settings.get('reveal_area_multiplier', 1.0)
+                    reveal_area_multiplier=settings.get('reveal_area_multiplier', 1.0),
+                    workers=app.config['RENDER_WORKERS'],
+                    line_renderer=settings.get('line_renderer', 'circles'),
+                    cache=render_cache if settings.get('use_cache', True) else None,
+                    path_cache=path_cache,
+                    seed=seed,
+                    encoder_profile=encoder_profile,
+                    encoder_settings=encoder_settings,
+                    encode_mode=app.config['ENCODE_MODE']
                 )
                 
-                if success:
-                    results.append({
-                        'file_id': file_id,
-                        'success': True,
-                        'animation_url': url_for('download_file', filename=animation_filename),
-                        'animation_filename': animation_filename
-                    })
-                else:
-                    results.append({
-                        'file_id': file_id,
-                        'success': False,
-                        'error': 'Animation creation failed'
-                    })
+                pending.append((index, render_kwargs))
                     
             except Exception as e:
                 results.append({
@@ -195,8 +299,60 @@ def process_batch():
                     'error': str(e)
                 })
         
+        # URL dihitung di sini karena generator stream berjalan di luar request context
+        animation_files = {index: os.path.basename(render_kwargs['output_path']) for index, render_kwargs in pending}
+        download_urls = {index: url_for('download_file', filename=filename) for index, filename in animation_files.items()}
+        
+        if run_async:
+            # Satu job untuk seluruh batch, item dirender di process pool BatchRenderer;
+            # progress + hasil per item lewat /jobs/<job_id> (field 'items') atau SSE
+            job_id = render_jobs.submit(run_batch_job, results, pending, file_ids, animation_files, download_urls)
+            return jsonify({
+                'success': True,
+                'async': True,
+                **job_urls(job_id),
+                'results': results,
+                'total': len(file_ids),
+                'queued': len(pending)
+            }), 202
+        
+        def iter_batch_results():
+            """Render semua item di batch pool, yield hasil per item begitu selesai"""
+            yield from results
+            for index, success, error in batch_renderer.iter_results(pending):
+                if success:
+                    yield {
+                        'file_id': file_ids[index],
+                        'success': True,
+                        'animation_url': download_urls[index],
+                        'animation_filename': animation_files[index]
+                    }
+                else:
+                    yield {
+                        'file_id': file_ids[index],
+                        'success': False,
+                        'error': error
+                    }
+        
+        if data.get('stream', False):
+            # NDJSON: satu baris per item sesuai urutan selesai, baris terakhir ringkasan batch
+            def generate():
+                successful = failed = 0
+                for result in iter_batch_results():
+                    successful += result['success']
+                    failed += not result['success']
+                    yield json.dumps(result) + '\n'
+                yield json.dumps({'done': True, 'total': len(file_ids), 'successful': successful, 'failed': failed}) + '\n'
+            
+            return Response(generate(), mimetype='application/x-ndjson',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+        # Hasil dikembalikan sesuai urutan file_ids
+        results = sorted(iter_batch_results(), key=lambda r: file_ids.index(r['file_id']))
+        
         return jsonify({
             'success': True,
+            'async': False,
             'results': results,
             'total': len(file_ids),
             'successful': len([r for r in results if r['success']]),
@@ -273,6 +429,118 @@ def save_line_art():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def line_art_paths(file_id):
+    """(original_path, line_art_filename) untuk generate line art di server, atau None jika upload tidak ada"""
+    original_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) 
+                     if f.startswith(f"{file_id}_original")]
+    if not original_files:
+        return None
+    # Nama file sama dengan /save_line_art supaya render dan cache tidak membedakan asal line art
+    return os.path.join(app.config['UPLOAD_FOLDER'], original_files[0]), f"{file_id}_line_art.jpg"
+
+def get_server_line_art_processor():
+    """LineArtProcessor bersama (warm) dengan setting dynamic batching, tiling dan resolusi dari config"""
+    from modules.line_art_processor import get_line_art_processor
+    return get_line_art_processor(max_batch_size=app.config['LINE_ART_BATCH_SIZE'],
+                                  batch_wait=app.config['LINE_ART_BATCH_WAIT'],
+                                  batch_timeout=app.config['LINE_ART_BATCH_TIMEOUT'],
+                                  tile_size=app.config['LINE_ART_TILE_SIZE'],
+                                  tile_overlap=app.config['LINE_ART_TILE_OVERLAP'],
+                                  max_memory_mb=app.config['LINE_ART_MAX_MEMORY_MB'],
+                                  max_side=app.config['LINE_ART_INFERENCE_MAX_SIDE'],
+                                  output_max_side=app.config['LINE_ART_OUTPUT_MAX_SIDE'],
+                                  session_options={**app.config['LINE_ART_SESSION_OPTIONS'],
+                                                   'profiling': app.config['LINE_ART_PROFILING']})
+
+@app.route('/generate_line_art', methods=['POST'])
+def generate_line_art():
+    """Generate line art di server (ONNX model native) - alternatif dari proses di browser + /save_line_art"""
+    try:
+        data = request.get_json()
+        file_id = data.get('file_id')
+        
+        if not file_id:
+            return jsonify({'error': 'File ID required'}), 400
+        
+        paths = line_art_paths(file_id)
+        if paths is None:
+            return jsonify({'error': 'Original file not found'}), 404
+        original_path, line_art_filename = paths
+        
+        processor = get_server_line_art_processor()
+        if not processor.is_model_ready():
+            return jsonify({'error': 'Line art model not available'}), 503
+        
+        # Request bersamaan dari client lain digabung jadi satu batch inference oleh processor
+        line_art_path = os.path.join(app.config['OUTPUT_FOLDER'], line_art_filename)
+        if not processor.convert_to_line_art(original_path, line_art_path):
+            return jsonify({'error': 'Line art generation failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'file_id': file_id,
+            'line_art_url': url_for('download_file', filename=line_art_filename),
+            'line_art_filename': line_art_filename,
+            'message': 'Line art generated successfully'
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in generate_line_art: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/generate_line_art_batch', methods=['POST'])
+def generate_line_art_batch():
+    """Generate line art di server untuk banyak file sekaligus, hasil per file sesuai urutan file_ids"""
+    try:
+        data = request.get_json()
+        file_ids = data.get('file_ids', [])
+        
+        if not file_ids:
+            return jsonify({'error': 'No file IDs provided'}), 400
+        
+        processor = get_server_line_art_processor()
+        if not processor.is_model_ready():
+            return jsonify({'error': 'Line art model not available'}), 503
+        
+        results = []
+        items = []  # (index hasil, original_path, line_art_filename) untuk inference batch
+        for file_id in file_ids:
+            paths = line_art_paths(file_id)
+            if paths is None:
+                results.append({'file_id': file_id, 'success': False, 'error': 'Original file not found'})
+                continue
+            results.append({'file_id': file_id})
+            items.append((len(results) - 1, *paths))
+        
+        # Semua gambar dikirim ke batcher sekaligus, gambar berukuran sama dijalankan sebagai satu batch tensor
+        converted = processor.convert_many([
+            (original_path, os.path.join(app.config['OUTPUT_FOLDER'], line_art_filename))
+            for _, original_path, line_art_filename in items
+        ])
+        for (index, _, line_art_filename), success in zip(items, converted):
+            if success:
+                results[index].update({
+                    'success': True,
+                    'line_art_url': url_for('download_file', filename=line_art_filename),
+                    'line_art_filename': line_art_filename
+                })
+            else:
+                results[index].update({'success': False, 'error': 'Line art generation failed'})
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(file_ids),
+            'successful': len([r for r in results if r['success']]),
+            'failed': len([r for r in results if not r['success']])
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in generate_line_art_batch: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/create_animation', methods=['POST'])
 def create_animation():
     logger.info("=== CREATE ANIMATION REQUEST ===")
@@ -290,13 +558,29 @@ def create_animation():
         enable_random_line_reveal = data.get('enable_random_line_reveal', False)
         line_color = data.get('line_color')
         background_color = data.get('background_color')
+        line_renderer = data.get('line_renderer', 'circles')
+        use_cache = data.get('use_cache', True)
+        run_async = data.get('async', False)
+        preview = data.get('preview', False)
         
-        logger.info(f"Parameters - file_id: {file_id}, mode: {animation_mode}, style: {style_choice}, drawing: {drawing_duration}s, reveal: {reveal_duration}s, fps: {fps}, area_multiplier: {reveal_area_multiplier}, random_line: {enable_random_line_reveal}, line_color: {line_color}, bg_color: {background_color}")
+        logger.info(f"Parameters - file_id: {file_id}, mode: {animation_mode}, style: {style_choice}, drawing: {drawing_duration}s, reveal: {reveal_duration}s, fps: {fps}, area_multiplier: {reveal_area_multiplier}, random_line: {enable_random_line_reveal}, line_color: {line_color}, bg_color: {background_color}, seed: {data.get('seed')}")
         
         if not file_id:
             logger.error("No file_id provided")
             return jsonify({'error': 'File ID required'}), 400
         
+        try:
+            seed = parse_seed(data.get('seed'))
+        except (TypeError, ValueError):
+            logger.error(f"Invalid seed: {data.get('seed')}")
+            return jsonify({'error': 'Seed must be a non-negative integer'}), 400
+        
+        try:
+            encoder_profile, encoder_settings = parse_encoder_options(data, preview)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid encoder settings: {e}")
+            return jsonify({'error': f'Invalid encoder settings: {e}'}), 400
+        
         # Import animation creator
         from modules.animation_creator import AnimationCreator
         logger.info("AnimationCreator imported successfully")
@@ -332,13 +616,12 @@ def create_animation():
             logger.error(f"Line art file does not exist: {line_art_path}")
             return jsonify({'error': 'Line art file not found'}), 404
         
-        # Create animation
-        animation_filename = f"{file_id}_animation.mp4"
+        # Create animation (preview disimpan terpisah supaya tidak menimpa hasil render final)
+        animation_filename = f"{file_id}_preview.mp4" if preview else f"{file_id}_animation.mp4"
         animation_path = os.path.join(app.config['OUTPUT_FOLDER'], animation_filename)
         logger.info(f"Animation output path: {animation_path}")
         
-        logger.info("Starting animation creation...")
-        success = creator.create_combined_animation(
+        render_kwargs = dict(
             line_art_path=line_art_path,
             color_image_path=original_path,
             output_path=animation_path,
@@ -349,9 +632,36 @@ def create_animation():
             reveal_area_multiplier=reveal_area_multiplier,
             animation_mode=animation_mode,
             line_color=line_color,
-            background_color=background_color
+            background_color=background_color,
+            workers=app.config['RENDER_WORKERS'],
+            line_renderer=line_renderer,
+            cache=render_cache if use_cache else None,
+            path_cache=path_cache,
+            seed=seed,
+            preview=preview,
+            encoder_profile=encoder_profile,
+            encoder_settings=encoder_settings,
+            encode_mode=app.config['ENCODE_MODE']
         )
         
+        if run_async:
+            # Kembalikan job id langsung, render jalan di antrian job
+            job_id = render_jobs.submit(
+                run_animation_job,
+                url_for('download_file', filename=animation_filename),
+                animation_filename,
+                **render_kwargs
+            )
+            logger.info(f"Animation queued as job {job_id}")
+            return jsonify({
+                'success': True,
+                **job_urls(job_id),
+                'message': 'Animation job queued'
+            }), 202
+        
+        logger.info("Starting animation creation...")
+        success = creator.create_combined_animation(**render_kwargs)
+        
         logger.info(f"Animation creation result: {success}")
         
         if success:
@@ -360,6 +670,7 @@ def create_animation():
                 'success': True,
                 'animation_url': url_for('download_file', filename=animation_filename),
                 'animation_filename': animation_filename,
+                'preview': preview,
                 'message': 'Animation created successfully'
             })
         else:
@@ -382,6 +693,102 @@ def create_animation():
         
         return jsonify({'error': str(e)}), 500
 
+@app.route('/still_frame/<file_id>')
+def still_frame(file_id):
+    """Satu frame animasi sebagai gambar (poster/thumbnail) tanpa render video
+
+    Query: frame (index) / time (detik) / position (final, drawing_end, mid_reveal), max_side, format (png/jpg),
+    plus setting render yang sama dengan /create_animation (style_choice, durations, fps, seed, ...).
+    """
+    try:
+        args = request.args
+        try:
+            seed = parse_seed(args.get('seed'))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Seed must be a non-negative integer'}), 400
+        
+        image_format = args.get('format', 'png').lower()
+        if image_format not in ('png', 'jpg', 'jpeg'):
+            return jsonify({'error': 'Format must be png or jpg'}), 400
+        
+        max_side = args.get('max_side', type=int)
+        if 'max_side' in args and (max_side is None or max_side <= 0):
+            return jsonify({'error': 'max_side must be a positive integer'}), 400
+        
+        original_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) 
+                         if f.startswith(f"{file_id}_original")]
+        line_art_files = [f for f in os.listdir(app.config['OUTPUT_FOLDER']) 
+                         if f.startswith(f"{file_id}_line_art")]
+        if not original_files or not line_art_files:
+            return jsonify({'error': 'Required files not found'}), 404
+        
+        from modules.animation_creator import AnimationCreator
+        import cv2
+        creator = AnimationCreator()
+        
+        try:
+            frame = creator.create_still_frame(
+                line_art_path=os.path.join(app.config['OUTPUT_FOLDER'], line_art_files[0]),
+                color_image_path=os.path.join(app.config['UPLOAD_FOLDER'], original_files[0]),
+                style_choice=args.get('style_choice', 1, type=int),
+                drawing_duration=args.get('drawing_duration', 8, type=float),
+                reveal_duration=args.get('reveal_duration', 10, type=float),
+                fps=args.get('fps', 30, type=int),
+                reveal_area_multiplier=args.get('reveal_area_multiplier', 1.0, type=float),
+                animation_mode=args.get('animation_mode', 'full'),
+                line_color=args.get('line_color'),
+                background_color=args.get('background_color'),
+                line_renderer=args.get('line_renderer', 'circles'),
+                path_cache=path_cache,
+                seed=seed,
+                frame=args.get('frame', type=int),
+                time=args.get('time', type=float),
+                position=args.get('position', 'mid_reveal'),
+                max_side=max_side
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        extension = '.png' if image_format == 'png' else '.jpg'
+        ok, encoded = cv2.imencode(extension, frame)
+        if not ok:
+            return jsonify({'error': 'Failed to encode frame'}), 500
+        
+        return send_file(
+            io.BytesIO(encoded.tobytes()),
+            mimetype='image/png' if image_format == 'png' else 'image/jpeg'
+        )
+        
+    except Exception as e:
+        logger.error(f"Still frame error: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Status job render: fase, frame, persentase, ETA dan hasil"""
+    job = render_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    job['queue_position'] = render_jobs.queue_position(job_id)
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events: kirim status job tiap ada progress sampai job selesai/gagal"""
+    if render_jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        for job in render_jobs.iter_events(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(job)}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/uploads/<filename>')
 def serve_upload(filename):
     """Serve uploaded files"""
@@ -676,6 +1083,27 @@ def cleanup_temp():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/line_art_profile', methods=['POST'])
+def line_art_profile():
+    """Akhiri profiling onnxruntime line art dan kembalikan path file profile JSON (LINE_ART_PROFILING harus aktif)"""
+    try:
+        if not app.config['LINE_ART_PROFILING']:
+            return jsonify({'success': False, 'error': 'Line art profiling is disabled'}), 400
+        
+        from modules.line_art_processor import end_line_art_profiling
+        profile_path = end_line_art_profiling()
+        if not profile_path:
+            return jsonify({'success': False, 'error': 'No line art profile available'}), 404
+        
+        return jsonify({
+            'success': True,
+            'profile_path': os.path.abspath(profile_path),
+            'message': 'Profiling stopped, profile saved'
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ==================================================================
 # --- MODIFIKASI: Bagian untuk menjalankan Flask dan GUI Tkinter ---
 # ==================================================================
@@ -690,6 +1118,9 @@ def open_browser():
     webbrowser.open_new("http://127.0.0.1:5000")
 
 if __name__ == '__main__':
+    # Wajib untuk ProcessPoolExecutor (parallel render) di executable PyInstaller
+    multiprocessing.freeze_support()
+
     # Menjalankan server Flask di thread terpisah
     # Ini agar server tidak memblokir jendela GUI
     flask_thread = threading.Thread(target=run_flask)